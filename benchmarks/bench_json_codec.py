@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 编解码基准
+
+比较标准库 json 与 orjson 读取和写入缓存文件的耗时。写入使用
+json_codec.dump_file（临时文件 + fsync + os.replace 的原子写入），
+另外单独列出只序列化不写文件的耗时。
+
+用法:
+    python benchmarks/bench_json_codec.py                  # data/product_cache.json
+    python benchmarks/bench_json_codec.py a.json b.json    # 指定文件
+"""
+
+import argparse
+import sys
+import tempfile
+import timeit
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import STORAGE_CONFIG
+from utils import json_codec
+
+
+@contextmanager
+def backend(name: str):
+    """临时切换 json_codec 的后端"""
+    saved = json_codec.orjson
+    if name == 'json':
+        json_codec.orjson = None
+    try:
+        yield
+    finally:
+        json_codec.orjson = saved
+
+
+def available_backends() -> list:
+    return ['json', 'orjson'] if json_codec.orjson is not None else ['json']
+
+
+def best_ms(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1000
+
+
+def bench_file(path: Path, number: int, repeat: int):
+    data = json_codec.load_file(path)
+    size = path.stat().st_size
+
+    print(f'\n{path.name}  {size / 1024 / 1024:.2f} MB')
+    print(f'{"":10}{"load":>10}{"dumps":>10}{"dump_file":>12}')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / path.name
+        for name in available_backends():
+            with backend(name):
+                load_ms = best_ms(lambda: json_codec.load_file(path), number, repeat)
+                dumps_ms = best_ms(lambda: json_codec.dumps(data), number, repeat)
+                dump_ms = best_ms(lambda: json_codec.dump_file(data, target), number, repeat)
+                if json_codec.load_file(target) != data:
+                    print(f'{name}: 写入后读回的数据不一致')
+            print(f'{name:10}{load_ms:10.2f}{dumps_ms:10.2f}{dump_ms:12.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON 编解码基准')
+    parser.add_argument('files', nargs='*', help='要读写的 JSON 文件，默认产品参数缓存')
+    parser.add_argument('--number', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.files] or [STORAGE_CONFIG['cache_file']]
+    missing = [p for p in paths if not p.exists()]
+    if missing:
+        print(f'文件不存在: {", ".join(str(p) for p in missing)}')
+        return 1
+
+    print(f'Python {sys.version.split()[0]}  后端: {", ".join(available_backends())}  （单位 ms）')
+    for path in paths:
+        bench_file(path, args.number, args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+数据模型内存与序列化基准
+
+比较改动前的模型（基线 0c1f994 中的普通 dataclass 和手写的 to_dict/from_dict，
+原样复制在本文件中）与当前 slots 模型（生成的序列化方法和 from_trusted_dict）
+的单个对象内存、from_dict、from_trusted_dict 和 to_dict 耗时。
+
+数据使用本地缓存：ProductFeatures 为产品参数缓存中的全部型号，ProductInfo
+为离线价格库中的全部价格行（未同步时按缓存型号生成），InventoryInfo 按缓存
+型号生成。
+
+用法:
+    python benchmarks/bench_models.py
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import STORAGE_CONFIG
+from models import ProductInfo, ProductFeatures, InventoryInfo
+from utils import json_codec
+
+
+# 改动前（0c1f994）的模型定义：普通 dataclass 和手写的 to_dict/from_dict，没有 from_trusted_dict
+
+@dataclass
+class LegacyProductInfo:
+    product_model: str = ''
+    product_name: str = ''
+    product_id: int = 0
+    line_id: int = 0
+    brand: str = ''
+    series: str = ''
+    life_cycle: str = ''
+    life_cycle_meaning: str = ''
+    price: float = 0.0
+    wholesale_price: float = 0.0
+    catalog_price: float = 0.0
+    business_discount: str = ''
+    high_discount_price: Optional[int] = None
+    low_discount_price: Optional[int] = None
+    start_qty: int = 0
+    end_qty: int = 0
+    valid: bool = True
+    last_update_date: str = ''
+    is_exact_match: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            'product_model': self.product_model,
+            'product_name': self.product_name,
+            'product_id': self.product_id,
+            'line_id': self.line_id,
+            'brand': self.brand,
+            'series': self.series,
+            'life_cycle': self.life_cycle,
+            'life_cycle_meaning': self.life_cycle_meaning,
+            'price': self.price,
+            'wholesale_price': self.wholesale_price,
+            'catalog_price': self.catalog_price,
+            'business_discount': self.business_discount,
+            'high_discount_price': self.high_discount_price,
+            'low_discount_price': self.low_discount_price,
+            'start_qty': self.start_qty,
+            'end_qty': self.end_qty,
+            'valid': self.valid,
+            'last_update_date': self.last_update_date,
+            'is_exact_match': self.is_exact_match,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LegacyProductInfo':
+        return cls(
+            product_model=data.get('product_model', ''),
+            product_name=data.get('product_name', ''),
+            product_id=data.get('product_id', 0),
+            line_id=data.get('line_id', 0),
+            brand=data.get('brand', ''),
+            series=data.get('series', ''),
+            life_cycle=data.get('life_cycle', ''),
+            life_cycle_meaning=data.get('life_cycle_meaning', ''),
+            price=data.get('price', 0.0),
+            wholesale_price=data.get('wholesale_price', 0.0),
+            catalog_price=data.get('catalog_price', 0.0),
+            business_discount=data.get('business_discount', ''),
+            high_discount_price=data.get('high_discount_price'),
+            low_discount_price=data.get('low_discount_price'),
+            start_qty=data.get('start_qty', 0),
+            end_qty=data.get('end_qty', 0),
+            valid=data.get('valid', True),
+            last_update_date=data.get('last_update_date', ''),
+            is_exact_match=data.get('is_exact_match', False),
+        )
+
+
+@dataclass
+class LegacyProductFeatures:
+    product_model: str = ''
+    product_name: str = ''
+    product_id: int = 0
+    url: str = ''
+    features: List[str] = field(default_factory=list)
+    crawl_time: str = ''
+
+    def to_dict(self) -> dict:
+        return {
+            'product_model': self.product_model,
+            'product_name': self.product_name,
+            'product_id': self.product_id,
+            'url': self.url,
+            'features': self.features,
+            'crawl_time': self.crawl_time,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LegacyProductFeatures':
+        return cls(
+            product_model=data.get('product_model', ''),
+            product_name=data.get('product_name', ''),
+            product_id=data.get('product_id', 0),
+            url=data.get('url', ''),
+            features=data.get('features', []),
+            crawl_time=data.get('crawl_time', ''),
+        )
+
+    def get_features_text(self) -> str:
+        return '\n'.join(f"{i+1}. {f}" for i, f in enumerate(self.features))
+
+
+@dataclass
+class LegacyInventoryInfo:
+    product_model: str = ''
+    product_name: str = ''
+    life_cycle_meaning: str = ''
+    sub_inventory: str = ''
+    quantity: int = 0
+    in_transit: int = 0
+    today_out: int = 0
+    box_number: str = ''
+    price_info: str = ''
+
+    def to_dict(self) -> dict:
+        return {
+            'product_model': self.product_model,
+            'product_name': self.product_name,
+            'life_cycle_meaning': self.life_cycle_meaning,
+            'sub_inventory': self.sub_inventory,
+            'quantity': self.quantity,
+            'in_transit': self.in_transit,
+            'today_out': self.today_out,
+            'box_number': self.box_number,
+            'price_info': self.price_info,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LegacyInventoryInfo':
+        return cls(
+            product_model=data.get('product_model', ''),
+            product_name=data.get('product_name', ''),
+            life_cycle_meaning=data.get('life_cycle_meaning', ''),
+            sub_inventory=data.get('sub_inventory', ''),
+            quantity=data.get('quantity', 0),
+            in_transit=data.get('in_transit', 0),
+            today_out=data.get('today_out', 0),
+            box_number=data.get('box_number', ''),
+            price_info=data.get('price_info', ''),
+        )
+
+
+LEGACY_MODELS = {
+    ProductInfo: LegacyProductInfo,
+    ProductFeatures: LegacyProductFeatures,
+    InventoryInfo: LegacyInventoryInfo,
+}
+
+
+def load_datasets():
+    features = []
+    cache_file = STORAGE_CONFIG['cache_file']
+    if cache_file.exists():
+        features = list(json_codec.load_file(cache_file).get('products', {}).values())
+    if not features:
+        features = [ProductFeatures(product_model=f'TL-SG{i}', features=['千兆端口'] * 8).to_dict() for i in range(4000)]
+
+    models = [row.get('product_model') or '' for row in features]
+
+    prices = []
+    catalog_file = STORAGE_CONFIG['catalog_file']
+    if catalog_file.exists():
+        prices = list(json_codec.load_file(catalog_file).get('rows', {}).values())
+    if not prices:
+        prices = [
+            ProductInfo(product_model=model, product_name='交换机', price=199.0, business_discount='0.5~0.45',
+                        high_discount_price=100, low_discount_price=90, start_qty=1).to_dict()
+            for model in models
+        ]
+
+    inventories = [
+        InventoryInfo(product_model=model, sub_inventory='深圳仓', quantity=i % 50, box_number='20').to_dict()
+        for i, model in enumerate(models)
+    ]
+
+    return [
+        (ProductFeatures, features),
+        (ProductInfo, prices),
+        (InventoryInfo, inventories),
+    ]
+
+
+def best_ms(fn, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def object_bytes(cls, rows) -> float:
+    """从字典构造对象时每个对象新分配的字节数（字段值与源字典共享）"""
+    tracemalloc.start()
+    objects = [cls.from_dict(row) for row in rows]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated / max(len(objects), 1)
+
+
+def measure(cls, rows, repeat: int) -> dict:
+    from_dict_ms, objects = best_ms(lambda: [cls.from_dict(row) for row in rows], repeat)
+    trusted_ms = None
+    if hasattr(cls, 'from_trusted_dict'):
+        trusted_ms, _ = best_ms(lambda: [cls.from_trusted_dict(row) for row in rows], repeat)
+    to_dict_ms, _ = best_ms(lambda: [obj.to_dict() for obj in objects], repeat)
+    return {
+        'bytes': object_bytes(cls, rows),
+        'from_dict': from_dict_ms,
+        'from_trusted_dict': trusted_ms,
+        'to_dict': to_dict_ms,
+    }
+
+
+def _ms(value) -> str:
+    return '-' if value is None else f'{value:.2f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数据模型内存与序列化基准')
+    parser.add_argument('--repeat', type=int, default=60)
+    args = parser.parse_args()
+
+    print(f'Python {sys.version.split()[0]}')
+    for cls, rows in load_datasets():
+        before = measure(LEGACY_MODELS[cls], rows, args.repeat)
+        after = measure(cls, rows, args.repeat)
+
+        print(f'\n{cls.__name__} x {len(rows)}')
+        print(f'{"":24}{"改动前":>9}{"当前":>10}')
+        print(f'{"对象内存 (B)":20}{before["bytes"]:12.0f}{after["bytes"]:12.0f}')
+        for key in ('from_dict', 'from_trusted_dict', 'to_dict'):
+            print(f'{key + " (ms)":24}{_ms(before[key]):>12}{_ms(after[key]):>12}')
+
+
+if __name__ == '__main__':
+    main()
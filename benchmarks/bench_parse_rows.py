@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+价格行解析基准
+
+比较逐字段 elif 解析（旧 _parse_product）与按字段转换表批量解析
+（ProductService.parse_rows）的耗时，并确认两者结果一致。
+
+用法:
+    python benchmarks/bench_parse_rows.py                  # 合成数据
+    python benchmarks/bench_parse_rows.py page1.json ...   # 记录下来的 findByPage 响应
+
+响应文件可以是完整的 findByPage 响应（{'results': [...]}），也可以是数据行列表。
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import PRICE_QUERY_FIELDS
+from models import ProductInfo
+from services.product_service import ProductService
+from utils import json_codec, calculate_discount_prices
+
+
+def legacy_parse_product(raw_data: dict, query_model: str) -> ProductInfo:
+    """旧实现：每行遍历 PRICE_QUERY_FIELDS，按字段名判断类型后 setattr"""
+    product = ProductInfo()
+
+    for field_name, field_key in PRICE_QUERY_FIELDS.items():
+        raw_value = raw_data.get(field_key, '')
+
+        if 'price' in field_name.lower() and raw_value:
+            try:
+                setattr(product, field_name, float(raw_value))
+            except (ValueError, TypeError):
+                setattr(product, field_name, raw_value)
+        elif 'qty' in field_name.lower() and raw_value:
+            try:
+                setattr(product, field_name, int(raw_value))
+            except (ValueError, TypeError):
+                setattr(product, field_name, raw_value)
+        elif field_name == 'product_model':
+            product.product_model = raw_value
+        elif field_name == 'product_name':
+            product.product_name = raw_value
+        elif field_name == 'product_id':
+            product.product_id = int(raw_value) if raw_value else 0
+        elif field_name == 'line_id':
+            product.line_id = int(raw_value) if raw_value else 0
+        elif field_name == 'brand':
+            product.brand = raw_value
+        elif field_name == 'series':
+            product.series = raw_value
+        elif field_name == 'life_cycle':
+            product.life_cycle = raw_value
+        elif field_name == 'life_cycle_meaning':
+            product.life_cycle_meaning = raw_value
+        elif field_name == 'business_discount':
+            product.business_discount = raw_value
+        elif field_name == 'valid':
+            product.valid = bool(raw_value)
+        elif field_name == 'last_update_date':
+            product.last_update_date = raw_value
+
+    product.is_exact_match = (product.product_model.lower() == query_model.lower())
+
+    high_price, low_price = calculate_discount_prices(product.price, product.business_discount)
+    product.high_discount_price = high_price
+    product.low_discount_price = low_price
+
+    return product
+
+
+def synthetic_rows(count: int, seed: int = 1) -> list:
+    """按 findByPage 字段生成数据行，包含空值和字符串数字"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        rows.append({
+            'lineId': i,
+            'productId': str(1000 + i % 900),
+            'lineCode': f'L{i}',
+            'productModel': f'TL-SG{i % 900}',
+            'productName': '千兆交换机',
+            'price': rng.choice(['199', '1299.5', '', None, 15999, 88]),
+            'wholesalePrice': '100',
+            'catalogPrice': '',
+            'businessDiscount': rng.choice(['0.5~0.45', '0.6-0.5', '', 'x~y']),
+            'brandValue': 'TP-LINK',
+            'seriesValue': '商用',
+            'lifeCycle': 'A',
+            'lifeCycleMeaning': rng.choice(['在售', '停产']),
+            'startQty': rng.choice([1, '10', '', None]),
+            'endQty': '99',
+            'valid': rng.choice([1, 0, '', 'Y']),
+            'creationDate': '2024-01-01',
+            'lastUpdateDate': '2024-01-01',
+        })
+    return rows
+
+
+def load_rows(paths) -> list:
+    rows = []
+    for path in paths:
+        data = json_codec.load_file(path)
+        rows.extend(data.get('results', []) if isinstance(data, dict) else data)
+    return rows
+
+
+def best_ms(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='价格行解析基准')
+    parser.add_argument('payloads', nargs='*', help='记录下来的 findByPage 响应文件')
+    parser.add_argument('--rows', type=int, default=5000, help='没有响应文件时生成的行数')
+    parser.add_argument('--number', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = load_rows(args.payloads) if args.payloads else synthetic_rows(args.rows)
+    query = 'TL-SG1'
+    service = ProductService.__new__(ProductService)
+
+    legacy = [legacy_parse_product(row, query) for row in rows]
+    table = service.parse_rows(rows, query)
+    if legacy != table:
+        print('结果不一致')
+        return 1
+
+    legacy_ms = best_ms(lambda: [legacy_parse_product(row, query) for row in rows], args.number, args.repeat)
+    table_ms = best_ms(lambda: service.parse_rows(rows, query), args.number, args.repeat)
+
+    print(f'行数: {len(rows)}  Python {sys.version.split()[0]}')
+    print(f'逐字段解析: {legacy_ms:8.2f} ms')
+    print(f'parse_rows: {table_ms:8.2f} ms  ({legacy_ms / table_ms:.1f}x)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -44,12 +44,65 @@ QUERY_CONFIG = {
     'delay_min': 0.3,
     'delay_max': 0.8,
     'max_retries': 3,
+    'backoff_base': 0.5,
+    'backoff_max': 8,
+    'retry_after_max': 30,
+    'retry_statuses': (429, 500, 502, 503, 504),
+    'circuit_failure_threshold': 5,
+    'circuit_reset_timeout': 30,
+    'circuit_probe_timeout': 60,
+    'keepalive_interval': 600,
+    'concurrent_queries': 8,
+    'async_connection_limit': 100,
 }
 
 STORAGE_CONFIG = {
     'data_dir': BASE_DIR / 'data',
     'cache_file': BASE_DIR / 'data' / 'product_cache.json',
     'session_file': BASE_DIR / 'data' / '.session',
+    'search_cache_file': BASE_DIR / 'data' / 'search_cache.json',
+    'catalog_file': BASE_DIR / 'data' / 'price_catalog.json',
+    'snapshot_file': BASE_DIR / 'data' / 'snapshots.json',
+    'startup_report_file': BASE_DIR / 'data' / 'startup_report.json',
+}
+
+STARTUP_CONFIG = {
+    'history_size': 20,
+    'debug_overlay': False,
+}
+
+SEARCH_CONFIG = {
+    'debounce': 0.4,
+    'min_chars': 3,
+}
+
+FACET_CONFIG = {
+    'price_ranges': (100, 300, 1000, 3000),
+}
+
+SEARCH_CACHE_CONFIG = {
+    'enabled': True,
+    'ttl': 6 * 3600,
+    'max_entries': 500,
+    'revalidate': False,
+    'save_delay': 5,
+}
+
+INVENTORY_CACHE_CONFIG = {
+    'ttl': 120,
+}
+
+SNAPSHOT_CONFIG = {
+    'max_entries': 300,
+    'max_products': 20,
+    'prefetch_limit': 30,
+    'max_usage_entries': 200,
+    'save_delay': 2,
+}
+
+CATALOG_CONFIG = {
+    'page_size': 200,
+    'sort_field': 'lastUpdateDate',
 }
 
 CRAWLER_CONFIG = {
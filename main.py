@@ -11,15 +11,25 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from kivy.app import App
-from kivy.uix.screenmanager import ScreenManager, SlideTransition
-from kivy.core.window import Window
-from kivy.core.text import LabelBase
-from kivy.lang import Builder
-
-from screens import LoginScreen, MainScreen, DetailScreen, InventoryScreen
-from services import CacheService
-from config import init_android_assets, get_platform
+from utils.startup_timer import startup_timer
+
+with startup_timer.phase('import_kivy'):
+    from kivy.app import App
+    from kivy.uix.screenmanager import SlideTransition
+    from kivy.uix.label import Label
+    from kivy.core.window import Window
+    from kivy.core.text import LabelBase
+    from kivy.lang import Builder
+    from kivy.clock import Clock
+    from kivy.graphics import Color, Rectangle
+
+with startup_timer.phase('import_config'):
+    from config import init_android_assets, get_platform, STARTUP_CONFIG
+
+with startup_timer.phase('import_screens'):
+    import screens
+    from screens import LoginScreen, LazyScreenManager
+    from screens.background import background, search_lane
 
 CHINESE_FONTS = [
     'C:/Windows/Fonts/msyh.ttc',
@@ -73,42 +83,115 @@ KV_STYLE = '''
     background_color: 1, 1, 1, 1
 '''
 
+class StartupOverlay(Label):
+    """启动耗时调试浮层（STARTUP_CONFIG['debug_overlay']），点击关闭"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.font_size = '11sp'
+        self.color = (1, 1, 1, 1)
+        self.halign = 'left'
+        self.valign = 'top'
+        self.size_hint = (None, None)
+        self.padding = (8, 8)
+        
+        with self.canvas.before:
+            Color(0, 0, 0, 0.7)
+            self._bg_rect = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self._update_bg, size=self._update_bg, texture_size=self._update_size)
+        
+        self.refresh()
+        # 后台阶段（如加载参数缓存）在首帧之后结束，定时刷新
+        self._refresh_event = Clock.schedule_interval(lambda dt: self.refresh(), 1)
+    
+    def refresh(self):
+        self.text = '\n'.join(startup_timer.format_lines())
+    
+    def _update_size(self, instance, texture_size):
+        self.size = texture_size
+        self.pos = (0, Window.height - self.height)
+    
+    def _update_bg(self, instance, value):
+        self._bg_rect.pos = instance.pos
+        self._bg_rect.size = instance.size
+    
+    def on_touch_down(self, touch):
+        if self.collide_point(*touch.pos):
+            self._refresh_event.cancel()
+            Window.remove_widget(self)
+            return True
+        return False
+
+
 class TPLinkCRMApp(App):
     """TP-LINK CRM 应用"""
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.cache_service = CacheService()
-        self.font_name = register_chinese_font()
+        with startup_timer.phase('register_font'):
+            self.font_name = register_chinese_font()
     
     def build(self):
         self.title = 'TP-LINK CRM 产品查询'
         
-        init_android_assets()
-        
-        platform = get_platform()
-        if platform != 'android':
-            Window.size = (400, 700)
+        with startup_timer.phase('init_android_assets'):
+            init_android_assets()
         
-        Builder.load_string(KV_STYLE)
+        with startup_timer.phase('detect_platform'):
+            platform = get_platform()
+            if platform != 'android':
+                Window.size = (400, 700)
         
-        sm = ScreenManager(transition=SlideTransition())
+        with startup_timer.phase('load_kv'):
+            Builder.load_string(KV_STYLE)
         
-        sm.add_widget(LoginScreen(name='login'))
-        sm.add_widget(MainScreen(name='main'))
-        sm.add_widget(DetailScreen(name='detail'))
-        sm.add_widget(InventoryScreen(name='inventory'))
+        with startup_timer.phase('build_login_screen'):
+            sm = LazyScreenManager(transition=SlideTransition())
+            
+            # 只构建登录屏幕，其余屏幕在第一次进入时才导入和构建
+            sm.add_widget(LoginScreen(name='login'))
+            sm.register('main', lambda name: screens.MainScreen(name=name))
+            sm.register('detail', lambda name: screens.DetailScreen(name=name))
+            sm.register('inventory', lambda name: screens.InventoryScreen(name=name))
         
-        self.cache_service.load()
-        
-        login_screen = sm.get_screen('login')
-        login_screen.load_saved_credentials()
+        with startup_timer.phase('restore_session'):
+            login_screen = sm.get_screen('login')
+            login_screen.load_saved_credentials()
+            login_screen.try_restore_session()
         
         return sm
     
+    def on_start(self):
+        startup_timer.mark('on_start')
+        Window.bind(on_flip=self._on_first_frame)
+    
+    def _on_first_frame(self, *args):
+        Window.unbind(on_flip=self._on_first_frame)
+        startup_timer.finish()
+        background.submit(startup_timer.save)
+        
+        if STARTUP_CONFIG['debug_overlay']:
+            Window.add_widget(StartupOverlay())
+    
+    def _flush_caches(self):
+        """写入延迟保存的缓存，主屏幕尚未构建时没有需要写入的内容"""
+        sm = self.root
+        if sm is None or not sm.is_built('main'):
+            return
+        product_service = sm.get_screen('main').product_service
+        if product_service:
+            product_service.flush()
+    
     def on_pause(self):
+        # Android 暂停后进程可能被回收
+        background.submit(self._flush_caches)
         return True
     
+    def on_stop(self):
+        self._flush_caches()
+        search_lane.shutdown()
+        background.shutdown()
+    
     def on_resume(self):
         pass
 
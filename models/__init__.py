@@ -1,4 +1,9 @@
 # -*- coding: utf-8 -*-
 from models.product import ProductInfo, ProductFeatures, InventoryInfo, LoginResult
+from models.price_ladder import PriceLadder, QuoteLine
+from models.facet_index import FacetIndex, FACET_NAMES, FACET_TITLES
 
-__all__ = ['ProductInfo', 'ProductFeatures', 'InventoryInfo', 'LoginResult']
+__all__ = [
+    'ProductInfo', 'ProductFeatures', 'InventoryInfo', 'LoginResult',
+    'PriceLadder', 'QuoteLine', 'FacetIndex', 'FACET_NAMES', 'FACET_TITLES',
+]
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+分面索引
+"""
+
+from typing import List, Dict, Callable, Optional, Iterator
+
+from models.product import ProductInfo
+from utils.price_utils import to_price
+
+FACET_NAMES = ('brand', 'series', 'life_cycle', 'price', 'stock')
+
+FACET_TITLES = {
+    'brand': '品牌',
+    'series': '系列',
+    'life_cycle': '生命周期',
+    'price': '价格',
+    'stock': '库存',
+}
+
+EMPTY_VALUE = '(空)'
+STOCK_IN = '有货'
+STOCK_OUT = '无货'
+STOCK_UNKNOWN = '未查询'
+PRICE_UNKNOWN = '无价格'
+
+
+def price_range_labels(bounds) -> List[str]:
+    """价格区间标签，如 (100, 300) -> ['<100', '100-300', '≥300']"""
+    bounds = list(bounds)
+    if not bounds:
+        return []
+    labels = [f'<{bounds[0]:g}']
+    labels.extend(f'{low:g}-{high:g}' for low, high in zip(bounds, bounds[1:]))
+    labels.append(f'≥{bounds[-1]:g}')
+    return labels
+
+
+class FacetIndex:
+    """
+    结果列表的分面索引
+
+    每个分面值对应一个 int 位图，第 i 位表示第 i 个产品具有该值。
+    同一分面内选中的多个值取并集，不同分面之间取交集，组合过滤只是
+    位运算，不需要重新扫描产品列表。
+    """
+
+    def __init__(self, price_bounds=(), stock_lookup: Callable[[str], Optional[int]] = None):
+        """
+        Args:
+            price_bounds: 价格区间分界点（升序）
+            stock_lookup: stock_lookup(型号) 返回库存总数，未查询过返回None
+        """
+        self._bounds = list(price_bounds)
+        self._price_labels = price_range_labels(self._bounds)
+        self._stock_lookup = stock_lookup
+        self._bits: Dict[str, Dict[str, int]] = {name: {} for name in FACET_NAMES}
+        self._size = 0
+
+    @classmethod
+    def build(cls, products: List[ProductInfo], price_bounds=(),
+              stock_lookup: Callable[[str], Optional[int]] = None) -> 'FacetIndex':
+        index = cls(price_bounds, stock_lookup)
+        index.extend(products)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def all_mask(self) -> int:
+        return (1 << self._size) - 1
+
+    def _price_label(self, price) -> str:
+        """价格所在区间；没有有效价格的行单独归入“无价格”，不计入最低区间"""
+        price = to_price(price)
+        if price is None:
+            return PRICE_UNKNOWN
+        for bound, label in zip(self._bounds, self._price_labels):
+            if price < bound:
+                return label
+        return self._price_labels[-1] if self._price_labels else EMPTY_VALUE
+
+    def _stock_label(self, model: str) -> str:
+        quantity = self._stock_lookup(model) if self._stock_lookup else None
+        if quantity is None:
+            return STOCK_UNKNOWN
+        return STOCK_IN if quantity > 0 else STOCK_OUT
+
+    def _values(self, product: ProductInfo) -> Iterator[tuple]:
+        yield 'brand', (product.brand or '').strip() or EMPTY_VALUE
+        yield 'series', (product.series or '').strip() or EMPTY_VALUE
+        yield 'life_cycle', (product.life_cycle_meaning or '').strip() or EMPTY_VALUE
+        yield 'price', self._price_label(product.price)
+        yield 'stock', self._stock_label(product.product_model)
+
+    def extend(self, products: List[ProductInfo]):
+        """追加产品（翻页结果），已有的位不变"""
+        bits = self._bits
+        for offset, product in enumerate(products, self._size):
+            bit = 1 << offset
+            for facet, value in self._values(product):
+                values = bits[facet]
+                values[value] = values.get(value, 0) | bit
+        self._size += len(products)
+
+    def values(self, facet: str) -> List[str]:
+        """分面的全部取值；价格按区间顺序（无价格排在最后），其余按名称排序"""
+        values = self._bits[facet]
+        if facet == 'price':
+            return [label for label in self._price_labels + [PRICE_UNKNOWN] if label in values]
+        return sorted(values)
+
+    def bits(self, facet: str, value: str) -> int:
+        return self._bits[facet].get(value, 0)
+
+    def mask(self, selection: Dict[str, set], base: int = None, exclude: str = None) -> int:
+        """
+        计算选择条件对应的位图
+
+        Args:
+            selection: {分面: 选中的值集合}，空集合表示该分面不过滤
+            base: 起始位图，默认全部产品
+            exclude: 忽略该分面的选择（用于计算该分面自身的计数）
+        """
+        mask = self.all_mask if base is None else base
+        for facet, selected in selection.items():
+            if not selected or facet == exclude:
+                continue
+            values = self._bits[facet]
+            facet_mask = 0
+            for value in selected:
+                facet_mask |= values.get(value, 0)
+            mask &= facet_mask
+        return mask
+
+    def counts(self, facet: str, selection: Dict[str, set], base: int = None) -> Dict[str, int]:
+        """
+        分面各取值的实时计数
+
+        计数时应用其他分面的选择、忽略本分面的选择，这样同一分面内
+        追加选择时可以看到每个值会带来多少结果。
+        """
+        mask = self.mask(selection, base, exclude=facet)
+        return {value: (bits & mask).bit_count() for value, bits in self._bits[facet].items()}
+
+    @staticmethod
+    def indices(mask: int, start: int = 0) -> List[int]:
+        """位图中为 1 的下标（升序），start 之前的位忽略"""
+        # bin() 是线性的，逐位清除最低位在大位图上是平方级
+        digits = bin(mask >> start)[:1:-1]
+        return [start + i for i, digit in enumerate(digits) if digit == '1']
+
+    def select(self, products: List, mask: int, start: int = 0) -> List:
+        """按位图取出产品，products 与索引顺序一致"""
+        return [products[i] for i in self.indices(mask, start)]
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+阶梯价格
+"""
+
+import bisect
+from dataclasses import dataclass, replace
+from typing import Optional, List
+
+from models.product import ProductInfo
+from models.serializers import dict_serializable
+
+
+class PriceLadder:
+    """单个型号的全部数量阶梯，按起订量排序"""
+
+    __slots__ = ('product_model', '_starts', '_tiers')
+
+    def __init__(self, product_model: str, tiers: List[ProductInfo] = ()):
+        self.product_model = product_model
+        self._starts: List[int] = []
+        self._tiers: List[ProductInfo] = []
+
+        for tier in tiers:
+            self.add(tier)
+
+    def __len__(self) -> int:
+        return len(self._tiers)
+
+    @property
+    def tiers(self) -> List[ProductInfo]:
+        return list(self._tiers)
+
+    @property
+    def lowest_tier(self) -> Optional[ProductInfo]:
+        return self._tiers[0] if self._tiers else None
+
+    def add(self, tier: ProductInfo):
+        """加入一个阶梯（保存副本，调用方之后修改原对象不影响阶梯），起订量相同的阶梯会被替换"""
+        tier = replace(tier)
+        start_qty = tier.start_qty or 0
+        pos = bisect.bisect_left(self._starts, start_qty)
+
+        if pos < len(self._starts) and self._starts[pos] == start_qty:
+            self._tiers[pos] = tier
+        else:
+            self._starts.insert(pos, start_qty)
+            self._tiers.insert(pos, tier)
+
+    def tier_for(self, quantity: int) -> Optional[ProductInfo]:
+        """
+        查找数量所在的阶梯
+
+        取起订量不超过 quantity 的最高阶梯；该阶梯有截止数量（end_qty > 0）
+        且 quantity 超出时视为不在任何阶梯内。数量低于最低起订量时也不属于任何阶梯。
+
+        Returns:
+            阶梯对应的价格行，无匹配阶梯返回None
+        """
+        if not self._tiers:
+            return None
+
+        pos = bisect.bisect_right(self._starts, quantity) - 1
+        if pos < 0:
+            return None
+
+        tier = self._tiers[pos]
+        if tier.end_qty and quantity > tier.end_qty:
+            return None
+        return tier
+
+    def price_at(self, quantity: int) -> Optional[float]:
+        """数量对应的单价"""
+        tier = self.tier_for(quantity)
+        return tier.price if tier is not None else None
+
+
+@dict_serializable
+@dataclass(slots=True)
+class QuoteLine:
+    product_model: str = ''
+    quantity: int = 0
+    found: bool = False
+    product_name: str = ''
+    unit_price: float = 0.0
+    amount: float = 0.0
+    start_qty: int = 0
+    end_qty: int = 0
+    high_discount_price: Optional[int] = None
+    low_discount_price: Optional[int] = None
+    below_min_qty: bool = False
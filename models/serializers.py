@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+根据 dataclass 字段定义生成字典序列化方法
+"""
+
+from dataclasses import fields, MISSING
+
+
+def dict_serializable(cls):
+    """
+    为 dataclass 生成 to_dict / from_dict / from_trusted_dict
+
+    - to_dict: 返回 {字段名: 值}
+    - from_dict: 缺失的字段使用字段默认值，适合外部或旧版本数据
+    - from_trusted_dict: 要求所有字段齐全，直接按位置构造，用于本程序自己
+      写出的缓存数据；缺字段时回退到 from_dict
+
+    方法体按字段展开后编译，避免逐字段循环和 getattr 的开销。
+    """
+    names = [f.name for f in fields(cls)]
+    namespace = {}
+    from_dict_args = []
+
+    for f in fields(cls):
+        if f.default is not MISSING:
+            namespace[f'_d_{f.name}'] = f.default
+            from_dict_args.append(f"get({f.name!r}, _d_{f.name})")
+        elif f.default_factory is not MISSING:
+            namespace[f'_f_{f.name}'] = f.default_factory
+            from_dict_args.append(f"data[{f.name!r}] if {f.name!r} in data else _f_{f.name}()")
+        else:
+            from_dict_args.append(f"data[{f.name!r}]")
+
+    to_dict_items = ', '.join(f"{name!r}: self.{name}" for name in names)
+    trusted_args = ', '.join(f"data[{name!r}]" for name in names)
+
+    source = (
+        f"def to_dict(self):\n"
+        f"    return {{{to_dict_items}}}\n"
+        f"\n"
+        f"def from_dict(cls, data):\n"
+        f"    get = data.get\n"
+        f"    return cls({', '.join(from_dict_args)})\n"
+        f"\n"
+        f"def from_trusted_dict(cls, data):\n"
+        f"    try:\n"
+        f"        return cls({trusted_args})\n"
+        f"    except KeyError:\n"
+        f"        return cls.from_dict(data)\n"
+    )
+    exec(compile(source, f'<{cls.__name__} serializers>', 'exec'), namespace)
+
+    cls.to_dict = namespace['to_dict']
+    cls.from_dict = classmethod(namespace['from_dict'])
+    cls.from_trusted_dict = classmethod(namespace['from_trusted_dict'])
+    return cls
@@ -1,7 +1,33 @@
 # -*- coding: utf-8 -*-
-from .login_screen import LoginScreen
-from .main_screen import MainScreen
-from .detail_screen import DetailScreen
-from .inventory_screen import InventoryScreen
+"""
+屏幕层
 
-__all__ = ['LoginScreen', 'MainScreen', 'DetailScreen', 'InventoryScreen']
+屏幕模块在第一次访问时才导入（PEP 562），配合 LazyScreenManager
+使未进入的屏幕不参与启动。
+"""
+
+import importlib
+
+_EXPORTS = {
+    'LoginScreen': '.login_screen',
+    'MainScreen': '.main_screen',
+    'DetailScreen': '.detail_screen',
+    'InventoryScreen': '.inventory_screen',
+    'LazyScreenManager': '.screen_manager',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+屏幕后台任务执行器
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from kivy.clock import Clock
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def current_task() -> 'BackgroundTask':
+    """当前线程正在执行的后台任务，不在后台任务中调用时返回None"""
+    return getattr(_local, 'task', None)
+
+
+class BackgroundTask:
+    """后台任务句柄，cancel() 后结果和错误回调都不会再被调用"""
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _deliver(self, callback, *args):
+        # 在 UI 线程中再检查一次，覆盖结果已排队但任务刚被取消的情况
+        if callback is not None and not self.cancelled:
+            callback(*args)
+
+
+class BackgroundExecutor:
+    """
+    在线程池中执行阻塞操作（网络请求、爬虫等），结果通过 Clock 回到 UI 线程
+
+    用法:
+        task = background.submit(service.query, model, on_success=self._on_result)
+        task.cancel()   # 离开页面或发起新查询时
+    """
+
+    def __init__(self, max_workers: int = 4, thread_name_prefix: str = 'ui-background', latest_only: bool = False):
+        """
+        Args:
+            max_workers: 线程数
+            thread_name_prefix: 线程名前缀
+            latest_only: 为True时提交新任务会取消之前提交的任务，排队中的旧任务不再执行
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._latest_only = latest_only
+        self._last_task = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, on_success=None, on_error=None, **kwargs) -> BackgroundTask:
+        """
+        提交后台任务
+
+        Args:
+            fn: 在后台线程中执行的函数
+            on_success: 成功回调 on_success(result)，在 UI 线程中调用
+            on_error: 失败回调 on_error(exception)，在 UI 线程中调用
+
+        Returns:
+            BackgroundTask
+        """
+        task = BackgroundTask()
+
+        if self._latest_only:
+            with self._lock:
+                if self._last_task is not None:
+                    self._last_task.cancel()
+                self._last_task = task
+
+        def run():
+            if task.cancelled:
+                return
+
+            _local.task = task
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                logger.exception(f"后台任务异常: {e}")
+                if not task.cancelled:
+                    Clock.schedule_once(lambda dt: task._deliver(on_error, e))
+                return
+            finally:
+                _local.task = None
+
+            if not task.cancelled:
+                Clock.schedule_once(lambda dt: task._deliver(on_success, result))
+
+        self._executor.submit(run)
+        return task
+
+    def call_in_ui(self, callback, *args):
+        """从后台线程中把调用转回 UI 线程（如进度更新）"""
+        Clock.schedule_once(lambda dt: callback(*args))
+
+    def shutdown(self):
+        """退出时取消排队中的任务，不等待正在执行的请求"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+background = BackgroundExecutor()
+
+# 搜索和翻页专用的通道：只执行最新提交的查询，快速输入时被取代的查询在排队中
+# 直接丢弃，不会占满共享线程池而拖慢详情、库存等其他请求。两个线程使新查询
+# 不必排在仍在等待超时的旧请求之后；旧请求由任务函数通过 current_task() 检查
+# 取消状态，在重试之间退出
+search_lane = BackgroundExecutor(max_workers=2, thread_name_prefix='ui-search', latest_only=True)
@@ -10,12 +10,16 @@ from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.popup import Popup
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.clock import Clock
 from kivy.properties import StringProperty
 from kivy.graphics import Color, Rectangle
 
 from services import ProductService, CacheService, CrawlerService
 from models import ProductInfo, ProductFeatures
+from screens.background import background
 
 
 class InfoRow(BoxLayout):
@@ -78,6 +82,26 @@ class InfoRow(BoxLayout):
         Clipboard.copy(str(value) if value else '')
 
 
+class FeatureRow(RecycleDataViewBehavior, Label):
+    """产品参数行（RecycleView 行视图，高度随换行后的文字变化）"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.font_size = '13sp'
+        self.size_hint_y = None
+        self.halign = 'left'
+        self.valign = 'top'
+        self.color = (0.3, 0.3, 0.3, 1)
+        self.padding = (0, 3)
+        self.bind(width=self._update_text_width, texture_size=self._update_height)
+    
+    def _update_text_width(self, instance, width):
+        self.text_size = (width, None)
+    
+    def _update_height(self, instance, texture_size):
+        self.height = texture_size[1]
+
+
 class DetailScreen(Screen):
     """产品详情屏幕"""
     
@@ -88,6 +112,8 @@ class DetailScreen(Screen):
         self.crawler_service = CrawlerService()
         self._current_product = None
         self._current_features = None
+        self._features_task = None
+        self._inventory_task = None
         self._build_ui()
     
     def _build_ui(self):
@@ -122,7 +148,7 @@ class DetailScreen(Screen):
         
         layout.add_widget(header)
         
-        scroll = ScrollView()
+        scroll = ScrollView(size_hint_y=0.5)
         content = BoxLayout(orientation='vertical', spacing=15, size_hint_y=None)
         content.bind(minimum_height=content.setter('height'))
         
@@ -174,47 +200,47 @@ class DetailScreen(Screen):
         
         content.add_widget(price_frame)
         
-        features_frame = BoxLayout(orientation='vertical', spacing=5, size_hint_y=None)
-        features_frame.bind(minimum_height=features_frame.setter('height'))
+        scroll.add_widget(content)
+        layout.add_widget(scroll)
+        
+        features_header = BoxLayout(orientation='horizontal', size_hint=(1, None), height=35)
         
         features_title = Label(
             text='产品参数',
             font_size='16sp',
-            size_hint_y=None,
-            height=35,
+            size_hint_x=0.7,
             halign='left',
+            valign='middle',
             color=(0.1, 0.56, 1, 1)
         )
         features_title.bind(size=features_title.setter('text_size'))
-        features_frame.add_widget(features_title)
-        
-        self.features_label = Label(
-            text='',
-            font_size='13sp',
-            size_hint_y=None,
-            halign='left',
-            valign='top',
-            color=(0.3, 0.3, 0.3, 1)
-        )
-        self.features_label.bind(texture_size=self.features_label.setter('size'))
-        features_frame.add_widget(self.features_label)
+        features_header.add_widget(features_title)
         
         copy_features_btn = Button(
             text='复制全部参数',
             font_size='14sp',
-            size_hint_y=None,
-            height=40,
+            size_hint_x=0.3,
             background_color=(0.85, 0.9, 1, 1),
             background_normal='',
             color=(0.2, 0.2, 0.2, 1)
         )
         copy_features_btn.bind(on_press=self._copy_features)
-        features_frame.add_widget(copy_features_btn)
+        features_header.add_widget(copy_features_btn)
         
-        content.add_widget(features_frame)
+        layout.add_widget(features_header)
         
-        scroll.add_widget(content)
-        layout.add_widget(scroll)
+        self.features_view = RecycleView(size_hint_y=0.5)
+        self.features_list = RecycleBoxLayout(
+            orientation='vertical',
+            spacing=4,
+            default_size=(None, 24),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
+        self.features_list.bind(minimum_height=self.features_list.setter('height'))
+        self.features_view.add_widget(self.features_list)
+        self.features_view.viewclass = FeatureRow
+        layout.add_widget(self.features_view)
         
         self.inventory_btn = Button(
             text='查询库存',
@@ -235,6 +261,7 @@ class DetailScreen(Screen):
         self._bg_rect.size = instance.size
     
     def set_product(self, product, product_service, cache_service):
+        self._cancel_tasks()
         self._current_product = product
         self.product_service = product_service
         self.cache_service = cache_service
@@ -264,26 +291,33 @@ class DetailScreen(Screen):
             self._current_features = features
             self._display_features(features)
         else:
-            self.features_label.text = '正在从官网获取产品参数...'
-            Clock.schedule_once(lambda dt: self._crawl_features(model), 0.1)
+            self._show_features_message('正在从官网获取产品参数...')
+            self._features_task = background.submit(
+                self.crawler_service.crawl_product_by_model, model,
+                on_success=self._on_features_crawled,
+                on_error=lambda e: self._on_features_crawled(None)
+            )
     
-    def _crawl_features(self, model):
-        features = self.crawler_service.crawl_product_by_model(model)
+    def _on_features_crawled(self, features):
+        self._features_task = None
         
         if features:
             self._current_features = features
             self._display_features(features)
             self.cache_service.set(features)
         else:
-            self.features_label.text = '⚠️ 官网无此产品参数'
+            self._show_features_message('⚠️ 官网无此产品参数')
             self._current_features = None
     
     def _display_features(self, features):
         if features and features.features:
-            text = '\n'.join(f"• {f}" for f in features.features)
-            self.features_label.text = text
+            self.features_view.data = [{'text': f"• {f}"} for f in features.features]
+            self.features_view.scroll_y = 1
         else:
-            self.features_label.text = '暂无产品参数'
+            self._show_features_message('暂无产品参数')
+    
+    def _show_features_message(self, text):
+        self.features_view.data = [{'text': text}]
     
     def _copy_features(self, instance):
         if self._current_features and self._current_features.features:
@@ -294,20 +328,47 @@ class DetailScreen(Screen):
             Clock.schedule_once(lambda dt: setattr(instance, 'text', '复制全部参数'), 1.5)
     
     def _go_back(self, instance):
+        self._cancel_tasks()
         self.manager.current = 'main'
     
     def _show_inventory(self, instance):
         if self._current_product and self.product_service:
+            cached = self.product_service.get_cached_inventory(self._current_product.product_model)
+            if cached is not None:
+                inventory_list, age = cached
+                self._open_inventory(inventory_list, age)
+                return
+            
             self.inventory_btn.disabled = True
             self.inventory_btn.text = '查询中...'
-            Clock.schedule_once(lambda dt: self._do_query_inventory(), 0.1)
+            self._inventory_task = background.submit(
+                self.product_service.query_inventory, self._current_product.product_model,
+                on_success=self._on_inventory_queried,
+                on_error=lambda e: self._on_inventory_queried([])
+            )
     
-    def _do_query_inventory(self):
-        inventory_list = self.product_service.query_inventory(self._current_product.product_model)
+    def _on_inventory_queried(self, inventory_list):
+        self._inventory_task = None
+        self._reset_inventory_btn()
         
+        self._open_inventory(inventory_list, 0)
+    
+    def _reset_inventory_btn(self):
         self.inventory_btn.disabled = False
         self.inventory_btn.text = '查询库存'
-        
+    
+    def _cancel_tasks(self):
+        """切换产品或离开页面时丢弃未完成的查询结果"""
+        for task in (self._features_task, self._inventory_task):
+            if task is not None:
+                task.cancel()
+        self._features_task = None
+        self._inventory_task = None
+        self._reset_inventory_btn()
+    
+    def _open_inventory(self, inventory_list, age):
         inventory_screen = self.manager.get_screen('inventory')
-        inventory_screen.set_product_with_data(self._current_product, inventory_list)
+        inventory_screen.set_product_with_data(
+            self._current_product, inventory_list, age=age, product_service=self.product_service
+        )
         self.manager.current = 'inventory'
@@ -9,21 +9,24 @@ from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.gridlayout import GridLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.clock import Clock
 from kivy.graphics import Color, Rectangle
 
 from services import ProductService
 from models import ProductInfo, InventoryInfo
+from utils import format_age
+from screens.background import background
 
 
-class InventoryItem(GridLayout):
-    """库存列表项"""
+class InventoryItem(RecycleDataViewBehavior, GridLayout):
+    """库存列表项（RecycleView 行视图，滚动时复用）"""
     
-    def __init__(self, inventory, **kwargs):
+    def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.cols = 4
-        self.size_hint_y = None
-        self.height = 45
         self.spacing = 5
         
         with self.canvas.before:
@@ -31,35 +34,48 @@ class InventoryItem(GridLayout):
             self._bg_rect = Rectangle(pos=self.pos, size=self.size)
         self.bind(pos=self._update_bg, size=self._update_bg)
         
-        self.add_widget(Label(
-            text=inventory.sub_inventory[:15] if inventory.sub_inventory else '',
+        self.sub_inventory_label = Label(
+            text='',
             font_size='13sp',
             halign='center',
             color=(0.2, 0.2, 0.2, 1)
-        ))
+        )
+        self.add_widget(self.sub_inventory_label)
         
-        qty_text = str(inventory.quantity)
-        qty_color = (0.2, 0.7, 0.3, 1) if inventory.quantity > 0 else (0.5, 0.5, 0.5, 1)
-        self.add_widget(Label(
-            text=qty_text,
+        self.quantity_label = Label(
+            text='',
             font_size='13sp',
-            color=qty_color,
+            color=(0.5, 0.5, 0.5, 1),
             halign='center'
-        ))
+        )
+        self.add_widget(self.quantity_label)
         
-        self.add_widget(Label(
-            text=str(inventory.in_transit or 0),
+        self.in_transit_label = Label(
+            text='',
             font_size='13sp',
             halign='center',
             color=(0.2, 0.2, 0.2, 1)
-        ))
+        )
+        self.add_widget(self.in_transit_label)
         
-        self.add_widget(Label(
-            text=inventory.price_info[:10] if inventory.price_info else '',
+        self.price_label = Label(
+            text='',
             font_size='13sp',
             halign='center',
             color=(0.2, 0.2, 0.2, 1)
-        ))
+        )
+        self.add_widget(self.price_label)
+    
+    def refresh_view_attrs(self, rv, index, data):
+        inventory = data['inventory']
+        
+        self.sub_inventory_label.text = inventory.sub_inventory[:15] if inventory.sub_inventory else ''
+        self.quantity_label.text = str(inventory.quantity)
+        self.quantity_label.color = (0.2, 0.7, 0.3, 1) if inventory.quantity > 0 else (0.5, 0.5, 0.5, 1)
+        self.in_transit_label.text = str(inventory.in_transit or 0)
+        self.price_label.text = inventory.price_info[:10] if inventory.price_info else ''
+        
+        return super().refresh_view_attrs(rv, index, data)
     
     def _update_bg(self, instance, value):
         self._bg_rect.pos = instance.pos
@@ -74,6 +90,7 @@ class InventoryScreen(Screen):
         self.product_service = None
         self._current_product = None
         self._inventory_list = []
+        self._query_task = None
         self._build_ui()
     
     def _build_ui(self):
@@ -115,11 +132,18 @@ class InventoryScreen(Screen):
         table_header.add_widget(Label(text='价格', font_size='14sp', bold=True, color=(0.1, 0.56, 1, 1)))
         layout.add_widget(table_header)
         
-        self.scroll_view = ScrollView()
-        self.inventory_list = BoxLayout(orientation='vertical', spacing=2, size_hint_y=None)
+        self.inventory_view = RecycleView()
+        self.inventory_list = RecycleBoxLayout(
+            orientation='vertical',
+            spacing=2,
+            default_size=(None, 45),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
         self.inventory_list.bind(minimum_height=self.inventory_list.setter('height'))
-        self.scroll_view.add_widget(self.inventory_list)
-        layout.add_widget(self.scroll_view)
+        self.inventory_view.add_widget(self.inventory_list)
+        self.inventory_view.viewclass = InventoryItem
+        layout.add_widget(self.inventory_view)
         
         summary_layout = BoxLayout(orientation='horizontal', size_hint=(1, None), height=50)
         
@@ -127,7 +151,7 @@ class InventoryScreen(Screen):
             text='总库存: 0',
             font_size='16sp',
             color=(0.1, 0.56, 1, 1),
-            size_hint_x=0.5
+            size_hint_x=0.35
         )
         summary_layout.add_widget(self.total_label)
         
@@ -135,10 +159,21 @@ class InventoryScreen(Screen):
             text='',
             font_size='14sp',
             color=(0.5, 0.5, 0.5, 1),
-            size_hint_x=0.5
+            size_hint_x=0.45
         )
         summary_layout.add_widget(self.status_label)
         
+        self.refresh_btn = Button(
+            text='刷新',
+            font_size='14sp',
+            size_hint_x=0.2,
+            background_color=(0.85, 0.9, 1, 1),
+            background_normal='',
+            color=(0.1, 0.3, 0.5, 1)
+        )
+        self.refresh_btn.bind(on_press=lambda x: self._refresh_inventory())
+        summary_layout.add_widget(self.refresh_btn)
+        
         layout.add_widget(summary_layout)
         
         self.add_widget(layout)
@@ -154,40 +189,93 @@ class InventoryScreen(Screen):
         self.title_label.text = f'{product.product_model} 库存'
         self._query_inventory(product.product_model)
     
-    def set_product_with_data(self, product, inventory_list):
+    def set_product_with_data(self, product, inventory_list, age=None, product_service=None):
+        if self._query_task is not None:
+            self._query_task.cancel()
+            self._query_task = None
         self._current_product = product
         self._inventory_list = inventory_list
+        if product_service:
+            self.product_service = product_service
         
         self.title_label.text = f'{product.product_model} 库存'
-        self._display_inventory(inventory_list)
+        self._display_inventory(inventory_list, age)
+        
+        if age is not None and self.product_service and not self.product_service.inventory_cache.is_fresh(age):
+            self._refresh_inventory()
     
     def _query_inventory(self, model):
-        self.inventory_list.clear_widgets()
+        cached = self.product_service.get_cached_inventory(model)
+        if cached is not None:
+            inventory_list, age = cached
+            self._inventory_list = inventory_list
+            self._display_inventory(inventory_list, age)
+            if not self.product_service.inventory_cache.is_fresh(age):
+                self._refresh_inventory()
+            return
+        
+        self.inventory_view.data = []
         self.status_label.text = '查询中...'
         
-        Clock.schedule_once(lambda dt: self._do_query(model))
+        if self._query_task is not None:
+            self._query_task.cancel()
+        self._query_task = background.submit(
+            self.product_service.query_inventory, model,
+            on_success=lambda inventory_list: self._on_queried(model, inventory_list),
+            on_error=lambda e: self._on_queried(model, [])
+        )
     
-    def _do_query(self, model):
-        inventory_list = self.product_service.query_inventory(model)
+    def _on_queried(self, model, inventory_list):
+        self._query_task = None
+        if not self._current_product or self._current_product.product_model != model:
+            return
+        
         self._inventory_list = inventory_list
         self._display_inventory(inventory_list)
     
-    def _display_inventory(self, inventory_list):
-        self.inventory_list.clear_widgets()
+    def _refresh_inventory(self):
+        if not self._current_product or not self.product_service:
+            return
+        
+        model = self._current_product.product_model
+        self.status_label.text = '刷新中...'
+        
+        def on_refreshed(inventory_list):
+            Clock.schedule_once(lambda dt: self._on_refreshed(model, inventory_list))
+        
+        self.product_service.refresh_inventory_async(model, on_refreshed)
+    
+    def _on_refreshed(self, model, inventory_list):
+        if not self._current_product or self._current_product.product_model != model:
+            return
         
-        total_quantity = 0
+        if inventory_list is None:
+            self.status_label.text = '刷新失败，显示缓存数据'
+            return
         
-        for inv in inventory_list:
-            item = InventoryItem(inv)
-            self.inventory_list.add_widget(item)
-            total_quantity += inv.quantity
+        self._inventory_list = inventory_list
+        self._display_inventory(inventory_list)
+    
+    def _display_inventory(self, inventory_list, age=None):
+        self.inventory_view.data = [{'inventory': inv} for inv in inventory_list]
+        
+        total_quantity = sum(inv.quantity or 0 for inv in inventory_list)
         
         self.total_label.text = f'总库存: {total_quantity}'
         
+        as_of = getattr(inventory_list, 'as_of', None)
+        if as_of:
+            age_text = f' · 离线数据（截至 {as_of}）'
+        else:
+            age_text = f' · {format_age(age)}' if age is not None else ''
+        
         if inventory_list:
-            self.status_label.text = f'共 {len(inventory_list)} 条记录'
+            self.status_label.text = f'共 {len(inventory_list)} 条记录{age_text}'
         else:
-            self.status_label.text = '暂无库存记录'
+            self.status_label.text = f'暂无库存记录{age_text}'
     
     def _go_back(self, instance):
+        if self._query_task is not None:
+            self._query_task.cancel()
+            self._query_task = None
         self.manager.current = 'detail'
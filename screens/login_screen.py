@@ -14,6 +14,7 @@ from kivy.graphics import Color, Rectangle
 
 from services import AuthService
 from models import LoginResult
+from screens.background import background
 
 
 class LoginScreen(Screen):
@@ -111,11 +112,13 @@ class LoginScreen(Screen):
         self.login_btn.text = '登录中...'
         self.status_label.text = '正在登录...'
         
-        Clock.schedule_once(lambda dt: self._do_login(username, password), 0.1)
+        background.submit(
+            self.auth_service.login, username, password,
+            on_success=self._on_login_result,
+            on_error=lambda e: self._on_login_result(LoginResult(success=False, message=f"登录异常: {e}"))
+        )
     
-    def _do_login(self, username, password):
-        result = self.auth_service.login(username, password)
-        
+    def _on_login_result(self, result):
         self.login_btn.disabled = False
         self.login_btn.text = '登 录'
         
@@ -123,10 +126,7 @@ class LoginScreen(Screen):
             self.status_label.text = f'登录成功: {result.user_name}'
             self.status_label.color = (0.2, 0.7, 0.3, 1)
             
-            main_screen = self.manager.get_screen('main')
-            main_screen.set_auth_service(self.auth_service, result.user_name, result.office_name)
-            
-            self.manager.current = 'main'
+            self._enter_main(result.user_name, result.office_name)
         else:
             self.status_label.text = f'登录失败: {result.message}'
             self.status_label.color = (0.9, 0.3, 0.3, 1)
@@ -148,3 +148,33 @@ class LoginScreen(Screen):
             self.username_input.text = username
         if password:
             self.password_input.text = password
+    
+    def _enter_main(self, user_name, office_name):
+        main_screen = self.manager.get_screen('main')
+        main_screen.set_auth_service(self.auth_service, user_name, office_name)
+        
+        self.manager.current = 'main'
+    
+    def try_restore_session(self):
+        """
+        启动时乐观恢复会话：直接进入主屏幕，后台验证会话，失败才回到登录屏幕
+        
+        Returns:
+            是否已进入主屏幕
+        """
+        if not self.auth_service.restore_session():
+            return False
+        
+        user_info = self.auth_service.user_info or {}
+        self._enter_main(user_info.get('chineseName', ''), user_info.get('officeName', ''))
+        
+        background.submit(self.auth_service.validate_session, on_success=self._on_session_validated)
+        return True
+    
+    def _on_session_validated(self, valid):
+        if valid:
+            return
+        
+        self.status_label.text = '会话已过期，请重新登录'
+        self.status_label.color = (0.9, 0.3, 0.3, 1)
+        self.manager.current = 'login'
@@ -12,23 +12,28 @@ from kivy.uix.button import Button
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.togglebutton import ToggleButton
 from kivy.uix.popup import Popup
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.clock import Clock
 from kivy.properties import StringProperty
 from kivy.graphics import Color, Rectangle
 
-from services import AuthService, ProductService, CacheService
-from models import ProductInfo
+from config import SEARCH_CONFIG, FACET_CONFIG
+from services import AuthService, ProductService, CacheService, LocalSearchService
+from models import ProductInfo, FacetIndex, FACET_NAMES, FACET_TITLES
+from screens.background import background, search_lane, current_task
+from utils.startup_timer import startup_timer
 
 
-class ProductItem(BoxLayout):
-    """产品列表项"""
+class ProductItem(RecycleDataViewBehavior, BoxLayout):
+    """产品列表项（RecycleView 行视图，滚动时复用）"""
     
-    def __init__(self, product, on_select, **kwargs):
+    def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.product = product
+        self.product = None
+        self.on_select = None
         self.orientation = 'horizontal'
-        self.size_hint_y = None
-        self.height = 60
         self.padding = (10, 5)
         
         with self.canvas.before:
@@ -36,21 +41,18 @@ class ProductItem(BoxLayout):
             self._bg_rect = Rectangle(pos=self.pos, size=self.size)
         self.bind(pos=self._update_bg, size=self._update_bg)
         
-        match_icon = '✓' if product.is_exact_match else '○'
-        icon_color = (0.1, 0.56, 1, 1) if product.is_exact_match else (0.6, 0.6, 0.6, 1)
-        
-        icon_label = Label(
-            text=match_icon,
+        self.icon_label = Label(
+            text='○',
             font_size='20sp',
             size_hint_x=0.1,
-            color=icon_color
+            color=(0.6, 0.6, 0.6, 1)
         )
-        self.add_widget(icon_label)
+        self.add_widget(self.icon_label)
         
         info_layout = BoxLayout(orientation='vertical', spacing=2)
         
-        model_label = Label(
-            text=product.product_model,
+        self.model_label = Label(
+            text='',
             font_size='16sp',
             size_hint_y=0.6,
             halign='left',
@@ -58,12 +60,11 @@ class ProductItem(BoxLayout):
             text_size=(None, None),
             color=(0.1, 0.3, 0.5, 1)
         )
-        model_label.bind(size=model_label.setter('text_size'))
-        info_layout.add_widget(model_label)
+        self.model_label.bind(size=self.model_label.setter('text_size'))
+        info_layout.add_widget(self.model_label)
         
-        name_text = product.product_name[:25] + '...' if len(product.product_name) > 25 else product.product_name
-        name_label = Label(
-            text=name_text,
+        self.name_label = Label(
+            text='',
             font_size='12sp',
             size_hint_y=0.4,
             halign='left',
@@ -71,22 +72,32 @@ class ProductItem(BoxLayout):
             color=(0.5, 0.5, 0.5, 1),
             text_size=(None, None)
         )
-        name_label.bind(size=name_label.setter('text_size'))
-        info_layout.add_widget(name_label)
+        self.name_label.bind(size=self.name_label.setter('text_size'))
+        info_layout.add_widget(self.name_label)
         
         self.add_widget(info_layout)
+    
+    def refresh_view_attrs(self, rv, index, data):
+        product = data['product']
+        
+        self.icon_label.text = '✓' if product.is_exact_match else '○'
+        self.icon_label.color = (0.1, 0.56, 1, 1) if product.is_exact_match else (0.6, 0.6, 0.6, 1)
+        self.model_label.text = product.product_model
         
-        self.bind(on_touch_down=self._on_touch)
-        self._on_select = on_select
+        name = product.product_name or ''
+        name = name[:25] + '...' if len(name) > 25 else name
+        self.name_label.text = f'[本地] {name}' if data.get('local') else name
+        
+        return super().refresh_view_attrs(rv, index, data)
     
     def _update_bg(self, instance, value):
         self._bg_rect.pos = instance.pos
         self._bg_rect.size = instance.size
     
-    def _on_touch(self, instance, touch):
+    def on_touch_down(self, touch):
         if self.collide_point(*touch.pos):
-            if self._on_select:
-                self._on_select(self.product)
+            if self.on_select and self.product:
+                self.on_select(self.product)
             return True
         return False
 
@@ -101,9 +112,21 @@ class MainScreen(Screen):
         self.auth_service = None
         self.product_service = None
         self.cache_service = CacheService()
+        self.local_search = LocalSearchService(self.cache_service)
         self._products = []
         self._filtered_products = []
         self._current_product = None
+        self._pager = None
+        self._loading_page = False
+        self._search_task = None
+        self._page_task = None
+        self._provisional_products = []
+        self._unconfirmed = set()
+        self._as_of = None
+        self._facets = FacetIndex()
+        self._facet_selection = {name: set() for name in FACET_NAMES}
+        self._facet_buttons = {}
+        self._search_trigger = Clock.create_trigger(self._on_debounced_search, SEARCH_CONFIG['debounce'])
         self._build_ui()
     
     def _build_ui(self):
@@ -121,7 +144,7 @@ class MainScreen(Screen):
             font_size='20sp',
             halign='left',
             valign='middle',
-            size_hint_x=0.7,
+            size_hint_x=0.55,
             color=(0.1, 0.3, 0.5, 1)
         )
         self.title_label.bind(size=self.title_label.setter('text_size'))
@@ -138,6 +161,17 @@ class MainScreen(Screen):
         self.cache_info_label.bind(size=self.cache_info_label.setter('text_size'))
         header.add_widget(self.cache_info_label)
         
+        self.sync_btn = Button(
+            text='同步',
+            font_size='14sp',
+            size_hint_x=0.15,
+            background_color=(0.85, 0.9, 1, 1),
+            background_normal='',
+            color=(0.1, 0.3, 0.5, 1)
+        )
+        self.sync_btn.bind(on_press=self._on_sync_catalog)
+        header.add_widget(self.sync_btn)
+        
         layout.add_widget(header)
         
         search_layout = BoxLayout(orientation='horizontal', size_hint=(1, None), height=50, spacing=10)
@@ -150,6 +184,7 @@ class MainScreen(Screen):
             background_color=(1, 1, 1, 1),
             foreground_color=(0.2, 0.2, 0.2, 1)
         )
+        self.search_input.bind(text=self._on_text_changed, on_text_validate=self._on_search)
         search_layout.add_widget(self.search_input)
         
         self.search_btn = Button(
@@ -171,7 +206,7 @@ class MainScreen(Screen):
             text='不看停产设备',
             font_size='14sp',
             state='down',
-            size_hint_x=0.5,
+            size_hint_x=0.3,
             background_color=(0.9, 0.95, 1, 1),
             background_normal='',
             color=(0.2, 0.2, 0.2, 1)
@@ -179,6 +214,17 @@ class MainScreen(Screen):
         self.hide_discontinued_btn.bind(on_press=self._on_filter_changed)
         filter_layout.add_widget(self.hide_discontinued_btn)
         
+        self.facet_btn = Button(
+            text='筛选',
+            font_size='14sp',
+            size_hint_x=0.2,
+            background_color=(0.9, 0.95, 1, 1),
+            background_normal='',
+            color=(0.2, 0.2, 0.2, 1)
+        )
+        self.facet_btn.bind(on_press=self._open_facets)
+        filter_layout.add_widget(self.facet_btn)
+        
         self.status_label = Label(
             text='请输入型号搜索',
             font_size='14sp',
@@ -190,11 +236,19 @@ class MainScreen(Screen):
         layout.add_widget(filter_layout)
         
         self.list_container = BoxLayout(orientation='vertical')
-        self.scroll_view = ScrollView()
-        self.product_list = BoxLayout(orientation='vertical', spacing=2, size_hint_y=None)
+        self.product_view = RecycleView()
+        self.product_list = RecycleBoxLayout(
+            orientation='vertical',
+            spacing=2,
+            default_size=(None, 60),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
         self.product_list.bind(minimum_height=self.product_list.setter('height'))
-        self.scroll_view.add_widget(self.product_list)
-        self.list_container.add_widget(self.scroll_view)
+        self.product_view.add_widget(self.product_list)
+        self.product_view.viewclass = ProductItem
+        self.product_view.bind(scroll_y=self._on_scroll)
+        self.list_container.add_widget(self.product_view)
         
         layout.add_widget(self.list_container)
         
@@ -206,11 +260,24 @@ class MainScreen(Screen):
     
     def set_auth_service(self, auth_service, user_name, office_name):
         self.auth_service = auth_service
-        self.product_service = ProductService(auth_service)
+        self.product_service = ProductService(auth_service, local_search=self.local_search)
         
         self.title_label.text = f'{user_name} ({office_name})'
         
-        self._refresh_cache_info()
+        # 加载参数缓存（约 2.4MB JSON）、搜索缓存和离线价格库放在后台，
+        # 输入时的本地结果只读取已加载的数据；完成后再显示缓存条数
+        self.cache_info_label.text = '缓存: 加载中'
+        background.submit(
+            self._preload_worker, self.product_service,
+            on_success=lambda _: self._refresh_cache_info(),
+            on_error=lambda e: self._refresh_cache_info()
+        )
+    
+    @staticmethod
+    def _preload_worker(product_service):
+        # 只记录第一次加载的耗时，显示在启动调试浮层中
+        with startup_timer.phase('preload_local'):
+            product_service.preload_local()
     
     def _refresh_cache_info(self):
         cache_info = self.cache_service.get_cache_info()
@@ -219,55 +286,355 @@ class MainScreen(Screen):
         else:
             self.cache_info_label.text = "缓存: 未初始化"
     
+    def _on_sync_catalog(self, instance):
+        if not self.product_service:
+            return
+        
+        self.sync_btn.disabled = True
+        self.status_label.text = '正在同步价格库...'
+        
+        background.submit(
+            self._sync_catalog_worker, self.product_service,
+            on_success=self._on_catalog_synced,
+            on_error=lambda e: self._on_catalog_synced((-1, 0))
+        )
+    
+    def _sync_catalog_worker(self, product_service):
+        def progress(fetched, total):
+            background.call_in_ui(self._on_sync_progress, fetched, total)
+        
+        count = product_service.catalog.sync(product_service, progress_callback=progress)
+        if count < 0:
+            return count, 0
+        
+        return count, product_service.prefetch_usual_models()
+    
+    def _on_sync_progress(self, fetched, total):
+        if self.sync_btn.disabled:
+            self.status_label.text = f'正在同步价格库... {fetched}/{total or "?"}'
+    
+    def _on_catalog_synced(self, result):
+        count, prefetched = result
+        
+        self.sync_btn.disabled = False
+        
+        if count < 0:
+            self.status_label.text = '价格库同步失败'
+            return
+        
+        info = self.product_service.catalog.get_info()
+        self.status_label.text = f"价格库已同步: {info['models']}个型号，预取常用型号{prefetched}个"
+    
     def _on_search(self, instance):
         model = self.search_input.text.strip()
         if not model:
             return
         
-        self.search_btn.disabled = True
+        self._search_trigger.cancel()
+        self._start_search(model)
+    
+    def _on_text_changed(self, instance, text):
+        self._search_trigger.cancel()
+        model = text.strip()
+        if self.product_service and len(model) >= SEARCH_CONFIG['min_chars']:
+            # 本地结果在当前帧内显示，CRM 查询仍按防抖延迟发起
+            self._show_provisional(model)
+            self._search_trigger()
+    
+    def _on_debounced_search(self, dt):
+        self._start_search(self.search_input.text.strip())
+    
+    def _start_search(self, model):
+        if not model or not self.product_service:
+            return
+        
+        self._show_provisional(model)
+        
         self.search_btn.text = '搜索中...'
-        self.status_label.text = '搜索中...'
         
-        Clock.schedule_once(lambda dt: self._do_search(model), 0.1)
+        if self._provisional_products:
+            self.status_label.text = f'本地 {len(self._filtered_products)} 个结果，更新中...'
+        else:
+            self.status_label.text = '搜索中...'
+        
+        self._search_task = search_lane.submit(
+            self._search_worker, self.product_service, model,
+            on_success=self._on_search_result,
+            on_error=lambda e: self._on_search_result((None, []))
+        )
     
-    def _do_search(self, model):
-        products = self.product_service.search_products(model)
-        self._products = products
-        self._refresh_product_list()
+    def _show_provisional(self, model):
+        """
+        立即显示本地结果（不发起网络请求）
         
-        self.search_btn.disabled = False
+        进行中的 CRM 查询对应的是旧关键字，一并取消。
+        """
+        self._cancel_search()
         self.search_btn.text = '搜索'
+        self._as_of = None
+        
+        self._provisional_products = self.product_service.search_cached(model)
+        if not self._provisional_products:
+            return
+        
+        self._unconfirmed = {p.product_model for p in self._provisional_products}
+        self._set_products(self._provisional_products)
+        self.status_label.text = f'本地 {len(self._filtered_products)} 个结果'
     
-    def _is_discontinued(self, product):
-        return (product.life_cycle_meaning or '').strip() == '停产'
+    def _cancel_search(self):
+        """取消进行中的搜索和翻页，丢弃其结果"""
+        for task in (self._search_task, self._page_task):
+            if task is not None:
+                task.cancel()
+        self._search_task = None
+        self._page_task = None
+        self._pager = None
+        self._loading_page = False
     
-    def _on_filter_changed(self, instance):
-        self._refresh_product_list()
+    @staticmethod
+    def _cancellable(product_service, fn, *args):
+        """在搜索通道中执行：任务被新查询取代后，请求在下一次重试前放弃"""
+        task = current_task()
+        with product_service.auth.cancellation(lambda: task is not None and task.cancelled):
+            return fn(*args)
     
-    def _refresh_product_list(self):
-        hide_discontinued = self.hide_discontinued_btn.state == 'down'
+    def _search_worker(self, product_service, model):
+        pager = product_service.iter_search_pages(model)
+        return pager, self._cancellable(product_service, next, pager, [])
+    
+    def _on_search_result(self, result):
+        pager, products = result
+        
+        self._search_task = None
+        self._as_of = getattr(products, 'as_of', None)
+        self._pager = pager if products and not self._as_of else None
+        merged = self._merge_results(products, self._provisional_products)
+        self._unconfirmed = {p.product_model for p in merged[len(products):]}
+        self._provisional_products = []
+        self._set_products(merged)
+        
+        self.search_btn.text = '搜索'
         
-        if hide_discontinued:
-            self._filtered_products = [p for p in self._products if not self._is_discontinued(p)]
+        Clock.schedule_once(self._fill_viewport, 0.1)
+    
+    def _merge_results(self, remote_products, local_products):
+        """
+        在线结果为准，补充在线结果中没有的本地结果
+        
+        补充的本地结果标记为未确认，之后的页面中出现同一型号时替换为在线结果。
+        """
+        remote_models = {p.product_model for p in remote_products}
+        return list(remote_products) + [p for p in local_products if p.product_model not in remote_models]
+    
+    def _on_scroll(self, instance, scroll_y):
+        if scroll_y <= 0.05 and self._pager and not self._loading_page:
+            self._loading_page = True
+            self.status_label.text = '加载更多...'
+            self._load_next_page()
+    
+    def _fill_viewport(self, dt):
+        # 结果不足一屏时无法滚动，直接加载下一页
+        if self.product_list.height < self.product_view.height:
+            self._on_scroll(self.product_view, 0)
+    
+    def _load_next_page(self):
+        pager = self._pager
+        self._page_task = search_lane.submit(
+            self._cancellable, self.product_service, next, pager, None,
+            on_success=lambda products: self._on_next_page(pager, products),
+            on_error=lambda e: self._on_next_page(pager, None)
+        )
+    
+    def _on_next_page(self, pager, products):
+        if pager is not self._pager:
+            return
+        
+        self._page_task = None
+        self._loading_page = False
+        
+        if not products:
+            self._pager = None
+            self._update_status()
+            return
+        
+        confirmed = self._unconfirmed.intersection(p.product_model for p in products)
+        if confirmed:
+            # 本地补充的型号出现在在线结果中，去掉本地行后重建
+            self._unconfirmed -= confirmed
+            kept = [p for p in self._products if p.product_model not in confirmed]
+            self._set_products(kept + list(products))
         else:
-            self._filtered_products = self._products
+            start = len(self._products)
+            self._products.extend(products)
+            self._facets.extend(products)
+            
+            new_products = self._facets.select(self._products, self._filter_mask(), start)
+            self._filtered_products.extend(new_products)
+            self.product_view.data.extend(self._view_data(new_products))
+            
+            self._update_status()
+            self._update_facet_buttons()
+        
+        Clock.schedule_once(self._fill_viewport, 0.1)
+    
+    def _set_products(self, products):
+        """替换结果列表并重建分面索引，新结果中仍存在的已选分面值保留"""
+        self._products = list(products)
+        stock_lookup = self.product_service.cached_stock if self.product_service else None
+        self._facets = FacetIndex.build(self._products, FACET_CONFIG['price_ranges'], stock_lookup)
+        
+        for facet, selected in self._facet_selection.items():
+            selected.intersection_update(self._facets.values(facet))
         
-        self.product_list.clear_widgets()
+        self._refresh_product_list()
+    
+    def _base_mask(self):
+        mask = self._facets.all_mask
+        if self.hide_discontinued_btn.state == 'down':
+            mask &= ~self._facets.bits('life_cycle', '停产')
+        return mask
+    
+    def _filter_mask(self):
+        return self._facets.mask(self._facet_selection, self._base_mask())
+    
+    def _on_filter_changed(self, instance):
+        self._refresh_product_list()
+    
+    def _view_data(self, products):
+        unconfirmed = self._unconfirmed
+        return [
+            {'product': p, 'on_select': self._on_product_select, 'local': p.product_model in unconfirmed}
+            for p in products
+        ]
+    
+    def _refresh_product_list(self):
+        """只更新 RecycleView 的数据，行视图由 RecycleView 按可见区域复用"""
+        self._filtered_products = self._facets.select(self._products, self._filter_mask())
+        self.product_view.data = self._view_data(self._filtered_products)
         
-        for product in self._filtered_products:
-            item = ProductItem(product, self._on_product_select)
-            self.product_list.add_widget(item)
+        self._update_status()
+        self._update_facet_buttons()
+    
+    def _update_status(self):
+        more = '，上滑加载更多' if self._pager else ''
+        if self._as_of:
+            more = f'，离线数据（截至 {self._as_of}）'
         
         if self._filtered_products:
             total = len(self._products)
             filtered = len(self._filtered_products)
-            if filtered < total:
-                self.status_label.text = f'{filtered}个产品（过滤{total - filtered}个停产）'
+            if filtered < total and self._selected_facet_count():
+                self.status_label.text = f'{filtered}个产品（筛选掉{total - filtered}个）{more}'
+            elif filtered < total:
+                self.status_label.text = f'{filtered}个产品（过滤{total - filtered}个停产）{more}'
             else:
-                self.status_label.text = f'找到 {filtered} 个产品'
+                self.status_label.text = f'找到 {filtered} 个产品{more}'
         else:
             self.status_label.text = '未找到匹配产品'
     
+    def _selected_facet_count(self):
+        return sum(len(selected) for selected in self._facet_selection.values())
+    
+    def _open_facets(self, instance):
+        """分面筛选弹窗，每个取值一个开关按钮，按钮上显示实时计数"""
+        self._facet_buttons = {}
+        
+        content = BoxLayout(orientation='vertical', spacing=10)
+        scroll = ScrollView()
+        groups = BoxLayout(orientation='vertical', spacing=8, size_hint_y=None)
+        groups.bind(minimum_height=groups.setter('height'))
+        
+        for facet in FACET_NAMES:
+            values = self._facets.values(facet)
+            if not values:
+                continue
+            
+            title = Label(
+                text=FACET_TITLES[facet],
+                font_size='15sp',
+                bold=True,
+                size_hint_y=None,
+                height=30,
+                halign='left',
+                valign='middle',
+                color=(0.1, 0.3, 0.5, 1)
+            )
+            title.bind(size=title.setter('text_size'))
+            groups.add_widget(title)
+            
+            grid = GridLayout(cols=2, spacing=5, size_hint_y=None, row_default_height=40, row_force_default=True)
+            grid.bind(minimum_height=grid.setter('height'))
+            
+            for value in values:
+                btn = ToggleButton(
+                    font_size='13sp',
+                    state='down' if value in self._facet_selection[facet] else 'normal',
+                    background_color=(0.9, 0.95, 1, 1),
+                    background_normal='',
+                    color=(0.2, 0.2, 0.2, 1),
+                    shorten=True
+                )
+                btn.bind(on_press=lambda b, f=facet, v=value: self._on_facet_toggled(f, v, b.state == 'down'))
+                grid.add_widget(btn)
+                self._facet_buttons[(facet, value)] = btn
+            
+            groups.add_widget(grid)
+        
+        scroll.add_widget(groups)
+        content.add_widget(scroll)
+        
+        actions = BoxLayout(orientation='horizontal', size_hint_y=None, height=45, spacing=10)
+        clear_btn = Button(text='清除筛选', font_size='15sp')
+        clear_btn.bind(on_press=lambda b: self._clear_facets())
+        actions.add_widget(clear_btn)
+        close_btn = Button(text='完成', font_size='15sp')
+        actions.add_widget(close_btn)
+        content.add_widget(actions)
+        
+        popup = Popup(
+            title='筛选',
+            content=content,
+            size_hint=(0.9, 0.8),
+            separator_color=(0.1, 0.56, 1, 1)
+        )
+        close_btn.bind(on_press=popup.dismiss)
+        popup.bind(on_dismiss=lambda p: self._facet_buttons.clear())
+        
+        self._update_facet_buttons()
+        popup.open()
+    
+    def _on_facet_toggled(self, facet, value, selected):
+        if selected:
+            self._facet_selection[facet].add(value)
+        else:
+            self._facet_selection[facet].discard(value)
+        self._refresh_product_list()
+    
+    def _clear_facets(self):
+        for selected in self._facet_selection.values():
+            selected.clear()
+        for btn in self._facet_buttons.values():
+            btn.state = 'normal'
+        self._refresh_product_list()
+    
+    def _update_facet_buttons(self):
+        """刷新筛选按钮和弹窗中各取值的计数（只做位运算，不扫描结果列表）"""
+        selected_count = self._selected_facet_count()
+        self.facet_btn.text = f'筛选({selected_count})' if selected_count else '筛选'
+        
+        if not self._facet_buttons:
+            return
+        
+        base = self._base_mask()
+        for facet in FACET_NAMES:
+            counts = self._facets.counts(facet, self._facet_selection, base)
+            for value, count in counts.items():
+                btn = self._facet_buttons.get((facet, value))
+                if btn is None:
+                    continue
+                btn.text = f'{value} ({count})'
+                btn.disabled = count == 0 and btn.state != 'down'
+    
     def _on_product_select(self, product):
         self._current_product = product
         detail_screen = self.manager.get_screen('detail')
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+按需构建屏幕的 ScreenManager
+"""
+
+import logging
+import time
+
+from kivy.uix.screenmanager import ScreenManager
+
+logger = logging.getLogger(__name__)
+
+
+class LazyScreenManager(ScreenManager):
+    """
+    屏幕先登记构建函数，第一次切换或 get_screen 时才构建
+
+    启动时只构建首屏（登录屏幕），其余屏幕的模块导入和控件树构建
+    推迟到第一次进入该屏幕时。
+    """
+
+    def __init__(self, **kwargs):
+        self._factories = {}
+        super().__init__(**kwargs)
+
+    def register(self, name: str, factory):
+        """
+        登记屏幕
+
+        Args:
+            name: 屏幕名称
+            factory: factory(name) 返回 Screen 实例
+        """
+        self._factories[name] = factory
+
+    def _build_screen(self, name: str):
+        factory = self._factories.pop(name)
+        start = time.perf_counter()
+        screen = factory(name)
+        self.add_widget(screen)
+        logger.info(f"构建屏幕 {name}: {(time.perf_counter() - start) * 1000:.0f}ms")
+        return screen
+
+    def get_screen(self, name):
+        if name in self._factories:
+            return self._build_screen(name)
+        return super().get_screen(name)
+
+    def has_screen(self, name):
+        return name in self._factories or super().has_screen(name)
+
+    def is_built(self, name: str) -> bool:
+        """屏幕是否已经构建"""
+        return name not in self._factories and super().has_screen(name)
@@ -1,7 +1,39 @@
 # -*- coding: utf-8 -*-
-from .auth_service import AuthService
-from .product_service import ProductService
-from .crawler_service import CrawlerService
-from .cache_service import CacheService
+"""
+服务层
 
-__all__ = ['AuthService', 'ProductService', 'CrawlerService', 'CacheService']
+各服务在第一次访问时才导入对应模块（PEP 562），登录屏幕只需要
+AuthService，不会在启动时导入 aiohttp、爬虫等模块。
+"""
+
+import importlib
+
+_EXPORTS = {
+    'AuthService': '.auth_service',
+    'AsyncAuthService': '.async_auth_service',
+    'ProductService': '.product_service',
+    'CrawlerService': '.crawler_service',
+    'CacheService': '.cache_service',
+    'SearchCacheService': '.search_cache_service',
+    'CatalogService': '.catalog_service',
+    'InventoryCacheService': '.inventory_cache_service',
+    'SnapshotService': '.snapshot_service',
+    'SnapshotResult': '.snapshot_service',
+    'LocalSearchService': '.local_search_service',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+CRM 异步认证服务
+"""
+
+import asyncio
+import logging
+from typing import Optional
+from urllib.parse import urljoin
+
+from config import CRM_CONFIG, QUERY_CONFIG
+from models import LoginResult
+from services.auth_service import AuthService
+from services.retry_policy import RetryPolicy, CircuitBreaker
+from utils import json_codec
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAuthService:
+    """CRM异步认证服务（基于 aiohttp，单线程内并发大量请求）"""
+
+    def __init__(self, headers: dict = None, cookies: dict = None):
+        if aiohttp is None:
+            raise ImportError("异步客户端需要安装 aiohttp: pip install aiohttp")
+
+        self.base_url = CRM_CONFIG['base_url']
+        self.timeout = QUERY_CONFIG['timeout']
+        self.max_retries = QUERY_CONFIG['max_retries']
+        self.verify_ssl = QUERY_CONFIG.get('verify_ssl', True)
+        self.connection_limit = QUERY_CONFIG.get('async_connection_limit', 100)
+        self.retry_policy = RetryPolicy(max_retries=self.max_retries)
+        self.circuit_breaker = CircuitBreaker()
+
+        self.headers = dict(headers or {})
+        self.is_logged_in = bool(cookies)
+        self.user_info = None
+
+        self._initial_cookies = dict(cookies or {})
+        self._session = None
+        self._session_loop = None
+        self._inflight = {}
+        self._auth_service = None
+
+    @classmethod
+    def from_auth_service(cls, auth_service) -> 'AsyncAuthService':
+        """复用同步 AuthService 的请求头、Cookie 和登录状态，会话过期时由其重新登录"""
+        client = cls(
+            headers=dict(auth_service.session.headers),
+            cookies=dict(auth_service.session.cookies),
+        )
+        client.is_logged_in = auth_service.is_logged_in
+        client.user_info = auth_service.user_info
+        client.retry_policy = auth_service.retry_policy
+        client.circuit_breaker = auth_service.circuit_breaker
+        client._auth_service = auth_service
+        return client
+
+    def _current_cookies(self) -> dict:
+        """新建会话时使用的 Cookie：有同步 AuthService 时取其最新 Cookie（可能已重新登录）"""
+        if self._auth_service is not None:
+            return dict(self._auth_service.session.cookies)
+        return self._initial_cookies
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        """
+        获取当前事件循环的连接池会话
+
+        aiohttp 会话绑定创建它的事件循环。每次 asyncio.run 都是新的循环，
+        循环变化时丢弃旧会话（旧循环已关闭时无法再关闭它）并重新创建。
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._session_loop is not loop:
+            if not self._session.closed and not self._session_loop.is_closed():
+                logger.warning("异步会话属于另一个仍在运行的事件循环，未关闭即被替换")
+            self._session = None
+            self._inflight.clear()
+
+        if self._session is None or self._session.closed:
+            self._initial_cookies = self._current_cookies()
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                ssl=None if self.verify_ssl else False,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            if self._initial_cookies:
+                self._session.cookie_jar.update_cookies(
+                    self._initial_cookies, response_url=URL(self.base_url)
+                )
+            self._session_loop = loop
+        return self._session
+
+    async def login(self, username: str, password: str) -> LoginResult:
+        """
+        登录CRM系统
+
+        Args:
+            username: 用户名
+            password: 密码
+
+        Returns:
+            LoginResult对象
+        """
+        logger.info(f"正在登录CRM系统（异步），用户名: {username}")
+
+        login_url = urljoin(self.base_url, CRM_CONFIG['api_login'])
+        session = self._get_session()
+
+        payload = {
+            'email': username,
+            'password': password
+        }
+
+        try:
+            async with session.post(
+                login_url,
+                data=payload,
+                headers={'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'}
+            ) as response:
+                logger.info(f"登录响应状态码: {response.status}")
+
+                if response.status != 200:
+                    error_msg = f"HTTP错误: {response.status}"
+                    logger.error(f"登录失败: {error_msg}")
+                    return LoginResult(success=False, message=error_msg)
+
+                result = json_codec.loads(await response.read())
+
+            if 'sessionInfo' in result:
+                self.user_info = result.get('sessionInfo', {})
+                self.is_logged_in = True
+                self.headers['Content-Type'] = 'application/json'
+
+                logger.info(f"登录成功！用户: {self.user_info.get('userName', 'unknown')}")
+
+                return LoginResult(
+                    success=True,
+                    message='登录成功',
+                    user_name=self.user_info.get('chineseName', ''),
+                    office_name=self.user_info.get('officeName', '')
+                )
+
+            error_msg = result.get('message', '登录失败')
+            logger.error(f"登录失败: {error_msg}")
+            return LoginResult(success=False, message=error_msg)
+
+        except asyncio.TimeoutError:
+            error_msg = "请求超时，请稍后重试"
+            logger.error(error_msg)
+            return LoginResult(success=False, message=error_msg)
+        except aiohttp.ClientConnectionError:
+            error_msg = "网络连接失败，请检查网络"
+            logger.error(error_msg)
+            return LoginResult(success=False, message=error_msg)
+        except Exception as e:
+            error_msg = f"登录异常: {str(e)}"
+            logger.error(error_msg)
+            return LoginResult(success=False, message=error_msg)
+
+    @staticmethod
+    def _request_key(api_path: str, params: dict = None) -> tuple:
+        """请求去重键，忽略 _dc 时间戳"""
+        items = tuple(sorted(
+            (k, str(v)) for k, v in (params or {}).items() if k != '_dc'
+        ))
+        return api_path, items
+
+    async def get(self, api_path: str, params: dict = None) -> Optional[dict]:
+        """
+        发起GET请求
+
+        与 AuthService.get 相同：按重试策略退避重试，401 返回None，熔断期间直接失败，
+        相同的并发请求共享一次HTTP请求的结果。
+        """
+        key = self._request_key(api_path, params)
+
+        flight = self._inflight.get(key)
+        if flight is not None:
+            return await asyncio.shield(flight)
+
+        flight = asyncio.ensure_future(self._get(api_path, params))
+        self._inflight[key] = flight
+        flight.add_done_callback(lambda f: self._inflight.pop(key, None))
+        return await asyncio.shield(flight)
+
+    async def _relogin(self, seen_generation: int) -> bool:
+        """通过同步 AuthService 重新登录，并同步新的 Cookie"""
+        if self._auth_service is None:
+            return False
+
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, self._auth_service.relogin, seen_generation):
+            return False
+
+        self._get_session().cookie_jar.update_cookies(
+            dict(self._auth_service.session.cookies), response_url=URL(self.base_url)
+        )
+        return True
+
+    async def _get(self, api_path: str, params: dict = None, allow_relogin: bool = True) -> Optional[dict]:
+        """发起GET请求（含重试，401 时自动重新登录并重放一次）"""
+        url = urljoin(self.base_url, api_path)
+        generation = self._auth_service._session_generation if self._auth_service else None
+        session = self._get_session()
+        query = {k: str(v) for k, v in (params or {}).items()}
+        policy = self.retry_policy
+        breaker = self.circuit_breaker
+
+        if not breaker.allow_request():
+            logger.warning("CRM 服务暂不可用，请求已熔断")
+            return None
+
+        for attempt in range(policy.max_retries):
+            retry_after = None
+            relogin = False
+            recorded = False
+
+            try:
+                async with session.get(url, params=query) as response:
+                    if response.status == 200:
+                        body = await response.read()
+                        breaker.record_success()
+                        recorded = True
+                        return AuthService._decode(body)
+                    elif response.status == 401:
+                        breaker.record_success()
+                        recorded = True
+                        relogin = True
+                    elif policy.should_retry_status(response.status):
+                        breaker.record_failure()
+                        recorded = True
+                        retry_after = policy.parse_retry_after(response.headers.get('Retry-After'))
+                        logger.warning(f"请求失败: {response.status} (尝试 {attempt + 1}/{policy.max_retries})")
+                    else:
+                        breaker.record_success()
+                        recorded = True
+                        logger.warning(f"请求失败: {response.status}")
+                        return None
+
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                # 只有超时和连接失败算作 CRM 故障
+                breaker.record_failure()
+                recorded = True
+                logger.warning(f"请求异常 (尝试 {attempt + 1}/{policy.max_retries}): {e}")
+            except Exception as e:
+                # 本地错误（事件循环已关闭等）不计入共享的熔断器，也不重试
+                logger.warning(f"请求异常: {e}")
+                return None
+            finally:
+                # 没有记录结果就结束（本地错误、任务被取消）时释放半开状态的探测名额，
+                # 否则熔断器会一直等待这次探测
+                if not recorded:
+                    breaker.release_probe()
+
+            if relogin:
+                if allow_relogin and await self._relogin(generation):
+                    return await self._get(api_path, params, allow_relogin=False)
+                logger.warning("会话已过期")
+                return None
+
+            if attempt < policy.max_retries - 1:
+                if not breaker.allow_request():
+                    logger.warning("CRM 服务暂不可用，停止重试")
+                    return None
+                await asyncio.sleep(policy.backoff(attempt, retry_after))
+
+        return None
+
+    async def close(self):
+        """关闭会话"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    async def aclose(self):
+        await self.close()
+
+    async def __aenter__(self) -> 'AsyncAuthService':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -3,19 +3,31 @@
 CRM 认证服务
 """
 
-import json
 import time
 import logging
+import threading
+from contextlib import contextmanager
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional
 from urllib.parse import urljoin
 
 from config import CRM_CONFIG, QUERY_CONFIG, STORAGE_CONFIG
 from models import LoginResult
+from services.retry_policy import RetryPolicy, CircuitBreaker
+from utils import json_codec
 
 logger = logging.getLogger(__name__)
 
 
+class _InflightRequest:
+    """进行中的请求，供相同请求的并发调用方等待结果"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
 class AuthService:
     """CRM认证服务"""
     
@@ -25,11 +37,29 @@ class AuthService:
         self.max_retries = QUERY_CONFIG['max_retries']
         self.verify_ssl = QUERY_CONFIG.get('verify_ssl', True)
         self.session_file = STORAGE_CONFIG['session_file']
+        self.retry_policy = RetryPolicy(max_retries=self.max_retries)
+        self.circuit_breaker = CircuitBreaker()
         
         self.session = requests.Session()
+        pool_size = QUERY_CONFIG.get('concurrent_queries', 10)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.is_logged_in = False
         self.user_info = None
         
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._request_stats = {'requests': 0, 'http_requests': 0, 'coalesced': 0, 'relogins': 0}
+        
+        self._local = threading.local()
+        
+        self._login_lock = threading.Lock()
+        self._session_generation = 0
+        self._last_activity = time.monotonic()
+        self.keepalive_interval = QUERY_CONFIG.get('keepalive_interval', 0)
+        self._keepalive_stop = None
+        
         if not self.verify_ssl:
             import urllib3
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -75,7 +105,7 @@ class AuthService:
             logger.info(f"登录响应状态码: {response.status_code}")
             
             if response.status_code == 200:
-                result = response.json()
+                result = json_codec.loads(response.content)
                 
                 if 'sessionInfo' in result:
                     self.user_info = result.get('sessionInfo', {})
@@ -83,6 +113,9 @@ class AuthService:
                     
                     self.session.headers['Content-Type'] = 'application/json'
                     self._save_session(username, password)
+                    self._session_generation += 1
+                    self._last_activity = time.monotonic()
+                    self.start_keepalive()
                     
                     logger.info(f"登录成功！用户: {self.user_info.get('userName', 'unknown')}")
                     
@@ -130,38 +163,79 @@ class AuthService:
                 'user_info': self.user_info,
                 'save_time': time.strftime('%Y-%m-%d %H:%M:%S')
             }
-            with open(self.session_file, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, ensure_ascii=False, indent=2)
+            json_codec.dump_file(session_data, self.session_file)
         except Exception as e:
             logger.error(f"保存会话失败: {e}")
     
     def load_session(self) -> bool:
-        """加载保存的会话"""
+        """加载保存的会话并在线验证"""
+        if not self.restore_session():
+            return False
+        return self.validate_session()
+    
+    def restore_session(self) -> bool:
+        """
+        从本地恢复会话（不发起网络请求）
+        
+        乐观地认为保存的 Cookie 仍然有效，调用方应随后在后台调用 validate_session。
+        
+        Returns:
+            是否恢复了 Cookie 和用户信息
+        """
         if not self.session_file.exists():
             return False
         
         try:
-            with open(self.session_file, 'r', encoding='utf-8') as f:
-                session_data = json.load(f)
-            
-            cookies = session_data.get('cookies', {})
-            self.session.cookies.update(cookies)
-            self.user_info = session_data.get('user_info')
-            
-            test_url = urljoin(self.base_url, '/api/initHome')
-            response = self.session.get(test_url, timeout=self.timeout, verify=self.verify_ssl)
-            
-            if response.status_code == 200:
-                self.is_logged_in = True
-                logger.info("会话验证成功")
-                return True
-            else:
-                logger.info("会话已过期")
-                return False
-                
+            session_data = json_codec.load_file(self.session_file)
         except Exception as e:
             logger.warning(f"加载会话失败: {e}")
             return False
+        
+        cookies = session_data.get('cookies', {})
+        user_info = session_data.get('user_info')
+        
+        if not cookies or not user_info:
+            return False
+        
+        self.session.cookies.update(cookies)
+        self.session.headers['Content-Type'] = 'application/json'
+        self.user_info = user_info
+        self.is_logged_in = True
+        
+        logger.info("已从本地恢复会话")
+        return True
+    
+    def validate_session(self) -> bool:
+        """
+        在线验证当前会话，过期时使用保存的凭证重新登录
+        
+        网络不可用时无法判断会话状态，保持当前登录状态不变。
+        
+        Returns:
+            会话是否可用
+        """
+        generation = self._session_generation
+        test_url = urljoin(self.base_url, '/api/initHome')
+        
+        try:
+            response = self.session.get(test_url, timeout=self.timeout, verify=self.verify_ssl)
+        except Exception as e:
+            logger.warning(f"会话验证失败（网络异常）: {e}")
+            return self.is_logged_in
+        
+        if response.status_code == 200:
+            self.is_logged_in = True
+            self._last_activity = time.monotonic()
+            self.start_keepalive()
+            logger.info("会话验证成功")
+            return True
+        
+        logger.info("会话已过期")
+        if response.status_code == 401 and self.relogin(generation):
+            return True
+        
+        self.is_logged_in = False
+        return False
     
     def get_saved_credentials(self) -> tuple:
         """获取保存的凭证"""
@@ -169,25 +243,194 @@ class AuthService:
             return None, None
         
         try:
-            with open(self.session_file, 'r', encoding='utf-8') as f:
-                session_data = json.load(f)
+            session_data = json_codec.load_file(self.session_file)
             return session_data.get('username'), session_data.get('password')
         except Exception:
             return None, None
     
+    def relogin(self, seen_generation: int = None) -> bool:
+        """
+        使用保存的凭证重新登录
+        
+        并发调用时只有一个线程真正登录；其他线程等待后，如果会话已在
+        seen_generation 之后被刷新，直接返回成功。
+        
+        Args:
+            seen_generation: 调用方发起请求时的会话版本号
+            
+        Returns:
+            是否已获得新的会话
+        """
+        with self._login_lock:
+            if seen_generation is not None and self._session_generation != seen_generation:
+                return self.is_logged_in
+            
+            username, password = self.get_saved_credentials()
+            if not username or not password:
+                logger.warning("会话已过期，且没有保存的凭证")
+                return False
+            
+            logger.info("会话已过期，使用保存的凭证重新登录")
+            with self._inflight_lock:
+                self._request_stats['relogins'] += 1
+            
+            return self.login(username, password).success
+    
+    def start_keepalive(self, interval: float = None):
+        """
+        启动会话保活线程
+        
+        空闲超过 interval 秒时请求 /api/initHome，会话失效则自动重新登录，
+        避免交互搜索时才发现会话过期。
+        """
+        interval = interval or self.keepalive_interval
+        if not interval or self._keepalive_stop is not None:
+            return
+        
+        stop_event = threading.Event()
+        self._keepalive_stop = stop_event
+        
+        def worker():
+            while not stop_event.wait(min(interval, 60)):
+                if time.monotonic() - self._last_activity < interval:
+                    continue
+                self._keepalive_ping()
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def stop_keepalive(self):
+        """停止会话保活线程"""
+        if self._keepalive_stop is not None:
+            self._keepalive_stop.set()
+            self._keepalive_stop = None
+    
+    def _keepalive_ping(self):
+        """保活请求"""
+        generation = self._session_generation
+        test_url = urljoin(self.base_url, '/api/initHome')
+        
+        try:
+            response = self.session.get(test_url, timeout=self.timeout, verify=self.verify_ssl)
+        except Exception as e:
+            logger.debug(f"会话保活失败: {e}")
+            return
+        
+        self._last_activity = time.monotonic()
+        
+        if response.status_code == 401:
+            self.relogin(generation)
+    
     def logout(self):
         """登出"""
+        self.stop_keepalive()
         self.is_logged_in = False
         self.user_info = None
         self.session.close()
         if self.session_file.exists():
             self.session_file.unlink()
     
+    @staticmethod
+    def _request_key(api_path: str, params: dict = None) -> tuple:
+        """请求去重键，忽略 _dc 时间戳"""
+        items = tuple(sorted(
+            (k, str(v)) for k, v in (params or {}).items() if k != '_dc'
+        ))
+        return api_path, items
+    
     def get(self, api_path: str, params: dict = None) -> Optional[dict]:
-        """发起GET请求"""
+        """
+        发起GET请求
+        
+        路径和参数（忽略 _dc）相同的并发请求只发起一次，所有调用方共享同一个
+        解析后的 JSON 对象，调用方不应修改返回值。
+        """
+        key = self._request_key(api_path, params)
+        
+        with self._inflight_lock:
+            self._request_stats['requests'] += 1
+            flight = self._inflight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _InflightRequest()
+                self._inflight[key] = flight
+            else:
+                self._request_stats['coalesced'] += 1
+        
+        if not is_leader:
+            logger.debug(f"合并重复请求: {api_path}")
+            flight.event.wait()
+            return flight.result
+        
+        try:
+            flight.result = self._get(api_path, params)
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+        
+        return flight.result
+    
+    @contextmanager
+    def cancellation(self, is_cancelled):
+        """
+        当前线程在此上下文中发起的请求可被取消
+        
+        每次重试前（包括退避等待期间）检查 is_cancelled()，返回True时放弃重试并
+        返回None。已经发出的单次请求无法中断，最多等到它超时。
+        
+        用法:
+            with auth.cancellation(lambda: task.cancelled):
+                auth.get(api, params)
+        """
+        previous = getattr(self._local, 'is_cancelled', None)
+        self._local.is_cancelled = is_cancelled
+        try:
+            yield
+        finally:
+            self._local.is_cancelled = previous
+    
+    def _cancelled(self) -> bool:
+        is_cancelled = getattr(self._local, 'is_cancelled', None)
+        return bool(is_cancelled and is_cancelled())
+    
+    def _wait_retry(self, delay: float) -> bool:
+        """退避等待，期间请求被取消时提前返回False"""
+        deadline = time.monotonic() + delay
+        while not self._cancelled():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            time.sleep(min(remaining, 0.2))
+        return False
+    
+    def get_request_stats(self) -> dict:
+        """
+        获取请求统计
+        
+        Returns:
+            {'requests': 调用次数, 'http_requests': 实际HTTP请求数, 'coalesced': 被合并的调用数,
+             'relogins': 自动重新登录次数}
+        """
+        with self._inflight_lock:
+            return dict(self._request_stats)
+    
+    def _get(self, api_path: str, params: dict = None, allow_relogin: bool = True) -> Optional[dict]:
+        """发起GET请求（含重试，401 时自动重新登录并重放一次）"""
         url = urljoin(self.base_url, api_path)
+        generation = self._session_generation
+        policy = self.retry_policy
+        breaker = self.circuit_breaker
+        
+        if not breaker.allow_request():
+            logger.warning("CRM 服务暂不可用，请求已熔断")
+            return None
         
-        for attempt in range(self.max_retries):
+        for attempt in range(policy.max_retries):
+            with self._inflight_lock:
+                self._request_stats['http_requests'] += 1
+            
+            retry_after = None
+            
             try:
                 response = self.session.get(
                     url, 
@@ -197,20 +440,52 @@ class AuthService:
                 )
                 
                 if response.status_code == 200:
-                    return response.json()
+                    breaker.record_success()
+                    self._last_activity = time.monotonic()
+                    return self._decode(response.content)
                 elif response.status_code == 401:
+                    breaker.record_success()
+                    if allow_relogin and self.relogin(generation):
+                        return self._get(api_path, params, allow_relogin=False)
                     logger.warning("会话已过期")
                     return None
+                elif policy.should_retry_status(response.status_code):
+                    breaker.record_failure()
+                    retry_after = policy.parse_retry_after(response.headers.get('Retry-After'))
+                    logger.warning(f"请求失败: {response.status_code} (尝试 {attempt + 1}/{policy.max_retries})")
                 else:
+                    breaker.record_success()
                     logger.warning(f"请求失败: {response.status_code}")
+                    return None
                     
             except Exception as e:
-                logger.warning(f"请求异常 (尝试 {attempt + 1}/{self.max_retries}): {e}")
-                if attempt < self.max_retries - 1:
-                    time.sleep(1)
+                breaker.record_failure()
+                logger.warning(f"请求异常 (尝试 {attempt + 1}/{policy.max_retries}): {e}")
+            
+            if attempt < policy.max_retries - 1:
+                if not self._wait_retry(policy.backoff(attempt, retry_after)):
+                    logger.info("请求已取消，停止重试")
+                    return None
+                if not breaker.allow_request():
+                    logger.warning("CRM 服务暂不可用，停止重试")
+                    return None
         
         return None
     
+    @staticmethod
+    def _decode(content: bytes) -> Optional[dict]:
+        """
+        解析 200 响应
+        
+        响应不是 JSON（如会话失效时返回的登录页）说明服务端已正常应答：
+        不算 CRM 故障，也不重试，返回None。同步和异步客户端共用此判断。
+        """
+        try:
+            return json_codec.loads(content)
+        except ValueError as e:
+            logger.warning(f"响应不是有效的 JSON: {e}")
+            return None
+    
     def close(self):
         """关闭会话"""
         try:
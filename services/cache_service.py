@@ -3,16 +3,15 @@
 产品参数缓存服务
 """
 
-import json
 import logging
 import re
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 
 from config import STORAGE_CONFIG
 from models import ProductFeatures
-from services.crawler_service import CrawlerService
+from utils import json_codec
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +29,8 @@ class CacheService:
         self._cache: Dict = {}
         self._model_to_id: Dict[str, int] = {}
         self._loaded = False
+        self._last_update = ''
+        self.version = 0
     
     def _normalize_model(self, model: str) -> str:
         """
@@ -112,12 +113,13 @@ class CacheService:
             return False
         
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = json_codec.load_file(self.cache_file)
             
             self._cache = data.get('products', {})
             self._model_to_id = data.get('model_to_id', {})
+            self._last_update = data.get('last_update', '')
             self._loaded = True
+            self.version += 1
             
             logger.info(f"加载缓存成功，共 {len(self._cache)} 个产品")
             return True
@@ -141,8 +143,7 @@ class CacheService:
                 'model_to_id': self._model_to_id,
             }
             
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            json_codec.dump_file(data, self.cache_file)
             
             logger.info(f"缓存保存成功，共 {len(self._cache)} 个产品")
             
@@ -175,14 +176,14 @@ class CacheService:
         if model_upper in self._cache:
             data = self._cache[model_upper]
             logger.info(f"缓存精确匹配: {model}")
-            return ProductFeatures.from_dict(data)
+            return ProductFeatures.from_trusted_dict(data)
         
         normalized_model = self._normalize_model(model)
         
         if normalized_model in self._cache:
             data = self._cache[normalized_model]
             logger.info(f"缓存规范化匹配: {model} -> {normalized_model}")
-            return ProductFeatures.from_dict(data)
+            return ProductFeatures.from_trusted_dict(data)
         
         best_match = None
         best_score = 0
@@ -196,7 +197,7 @@ class CacheService:
         if best_match and best_score >= 70:
             data = self._cache[best_match]
             logger.info(f"缓存模糊匹配: {model} -> {best_match} (得分={best_score})")
-            return ProductFeatures.from_dict(data)
+            return ProductFeatures.from_trusted_dict(data)
         
         logger.info(f"缓存未找到匹配: {model}")
         return None
@@ -211,13 +212,42 @@ class CacheService:
         
         if features.product_id:
             self._model_to_id[model_upper] = features.product_id
+        
+        self.version += 1
+    
+    def ensure_loaded(self):
+        """尚未加载时加载缓存文件（加载会增加 version）"""
+        if not self._loaded:
+            self.load()
+    
+    def list_products(self) -> List[Tuple[str, str]]:
+        """
+        缓存中的全部型号和名称
+        
+        Returns:
+            [(型号, 名称)]
+        """
+        if not self._loaded:
+            self.load()
+        
+        return [
+            (data.get('product_model') or model, data.get('product_name') or '')
+            for model, data in list(self._cache.items())
+        ]
     
     def has_cache(self) -> bool:
         """是否有缓存"""
         return self.cache_file.exists() and len(self._cache) > 0
     
     def get_cache_info(self) -> dict:
-        """获取缓存信息"""
+        """获取缓存信息（已加载时不再读取文件）"""
+        if self._loaded:
+            return {
+                'exists': True,
+                'total': len(self._cache),
+                'last_update': self._last_update,
+            }
+        
         if not self.cache_file.exists():
             return {
                 'exists': False,
@@ -226,8 +256,7 @@ class CacheService:
             }
         
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = json_codec.load_file(self.cache_file)
             
             return {
                 'exists': True,
@@ -251,6 +280,8 @@ class CacheService:
         Returns:
             更新的产品数量
         """
+        from services.crawler_service import CrawlerService
+        
         crawler = CrawlerService()
         
         def on_progress(current, total, product):
@@ -275,6 +306,7 @@ class CacheService:
         self._cache = {}
         self._model_to_id = {}
         self._loaded = False
+        self.version += 1
         
         if self.cache_file.exists():
             self.cache_file.unlink()
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+离线价格库服务
+"""
+
+import bisect
+import logging
+import threading
+from datetime import datetime
+from typing import Optional, List, Dict
+
+from config import STORAGE_CONFIG, CATALOG_CONFIG
+from models import ProductInfo
+from utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogService:
+    """离线价格库（整表同步 CRM 价格数据，本地按型号索引）"""
+
+    def __init__(self):
+        self.catalog_file = STORAGE_CONFIG['catalog_file']
+        self.page_size = CATALOG_CONFIG['page_size']
+        self.sort_field = CATALOG_CONFIG['sort_field']
+
+        self._rows: Dict[str, dict] = {}
+        self._watermark = ''
+        self._last_sync = ''
+
+        self._model_index: Dict[str, List[str]] = {}
+        self._sorted_models: List[str] = []
+
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    @staticmethod
+    def _row_key(product: ProductInfo) -> str:
+        """价格行主键，优先使用 lineId"""
+        if product.line_id:
+            return str(product.line_id)
+        return f"{product.product_model}|{product.start_qty}"
+
+    @staticmethod
+    def _date_key(value) -> str:
+        return str(value) if value else ''
+
+    def load(self) -> bool:
+        """加载价格库"""
+        with self._lock:
+            self._loaded = True
+
+            if not self.catalog_file.exists():
+                return False
+
+            try:
+                data = json_codec.load_file(self.catalog_file)
+
+                self._rows = data.get('rows', {})
+                self._watermark = data.get('watermark', '')
+                self._last_sync = data.get('last_sync', '')
+                self._rebuild_index()
+
+                logger.info(f"加载价格库成功，共 {len(self._rows)} 条")
+                return True
+
+            except Exception as e:
+                logger.error(f"加载价格库失败: {e}")
+                return False
+
+    def save(self):
+        """保存价格库"""
+        with self._lock:
+            try:
+                data = {
+                    'cache_version': '1.0',
+                    'last_sync': self._last_sync,
+                    'watermark': self._watermark,
+                    'total_rows': len(self._rows),
+                    'rows': self._rows,
+                }
+                json_codec.dump_file(data, self.catalog_file)
+
+                logger.info(f"价格库保存成功，共 {len(self._rows)} 条")
+
+            except Exception as e:
+                logger.error(f"保存价格库失败: {e}")
+
+    def _rebuild_index(self):
+        """重建型号索引"""
+        index: Dict[str, List[str]] = {}
+        for key, row in self._rows.items():
+            model_upper = (row.get('product_model') or '').upper()
+            if model_upper:
+                index.setdefault(model_upper, []).append(key)
+
+        self._model_index = index
+        self._sorted_models = sorted(index)
+
+    def is_available(self) -> bool:
+        """价格库是否有数据"""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            return bool(self._rows)
+
+    def get_info(self) -> dict:
+        """获取价格库信息"""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            return {
+                'total': len(self._rows),
+                'models': len(self._model_index),
+                'last_sync': self._last_sync,
+            }
+
+    def search(self, keyword: str, limit: int = None, blocking: bool = True) -> List[ProductInfo]:
+        """
+        本地搜索价格行
+
+        匹配顺序：型号完全相同、型号前缀、型号或名称包含关键字。
+        同一型号的所有阶梯行都会返回，由调用方去重。
+
+        Args:
+            keyword: 搜索关键字
+            limit: 最多返回的型号数量
+            blocking: 为False时不等待锁也不加载文件（UI 线程调用），
+                      价格库未加载或正在同步时返回空列表
+
+        Returns:
+            ProductInfo列表
+        """
+        if not self._lock.acquire(blocking=blocking):
+            return []
+
+        try:
+            if not self._loaded:
+                if not blocking:
+                    return []
+                self.load()
+
+            query = (keyword or '').strip().upper()
+            if not query:
+                return []
+
+            matched: List[str] = []
+            matched_set = set()
+
+            def add(model_upper):
+                if model_upper not in matched_set:
+                    matched_set.add(model_upper)
+                    matched.append(model_upper)
+
+            if query in self._model_index:
+                add(query)
+
+            pos = bisect.bisect_left(self._sorted_models, query)
+            while pos < len(self._sorted_models) and self._sorted_models[pos].startswith(query):
+                add(self._sorted_models[pos])
+                pos += 1
+
+            for model_upper in self._sorted_models:
+                if query in model_upper:
+                    add(model_upper)
+
+            for model_upper, keys in self._model_index.items():
+                if model_upper in matched_set:
+                    continue
+                name = (self._rows[keys[0]].get('product_name') or '').upper()
+                if query in name:
+                    add(model_upper)
+
+            if limit:
+                matched = matched[:limit]
+
+            return [
+                ProductInfo.from_trusted_dict(self._rows[key])
+                for model_upper in matched
+                for key in self._model_index[model_upper]
+            ]
+        finally:
+            self._lock.release()
+
+    def get_tiers(self, model: str) -> List[ProductInfo]:
+        """获取型号的全部阶梯价格行"""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+
+            keys = self._model_index.get((model or '').strip().upper(), [])
+            return [ProductInfo.from_trusted_dict(self._rows[key]) for key in keys]
+
+    def sync(self, product_service, full: bool = False, progress_callback=None) -> int:
+        """
+        从 CRM 同步价格库
+
+        按 lastUpdateDate 倒序分页拉取。增量同步时只写入更新时间晚于上次
+        同步水位的行；服务端确实按时间倒序返回时，遇到旧数据即停止翻页。
+        全量同步会替换整个价格库，以清除 CRM 中已删除的行。
+
+        Args:
+            product_service: ProductService实例
+            full: 是否全量同步
+            progress_callback: 进度回调 callback(fetched, total)
+
+        Returns:
+            写入的行数，同步失败返回-1
+        """
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            incremental = not full and bool(self._rows) and bool(self._watermark)
+            watermark = self._watermark if incremental else ''
+
+        logger.info(f"开始同步价格库 ({'增量' if incremental else '全量'})，水位: {watermark or '-'}")
+
+        sort = [{'property': self.sort_field, 'direction': 'DESC'}]
+        fetched_rows: Dict[str, dict] = {}
+        newest = watermark
+        start = 0
+
+        while True:
+            page = product_service.fetch_price_rows(start, self.page_size, sort=sort)
+
+            if page is None:
+                logger.error(f"同步价格库失败 (start={start})")
+                return -1
+
+            data = page['rows']
+            reached_old = False
+
+            changed = []
+            for item in data:
+                updated = self._date_key(item.get(self.sort_field))
+
+                if watermark and updated and updated <= watermark:
+                    reached_old = True
+                    continue
+
+                changed.append(item)
+                if updated > newest:
+                    newest = updated
+
+            for product in product_service.parse_rows(changed, ''):
+                fetched_rows[self._row_key(product)] = product.to_dict()
+
+            start += len(data)
+            total = page.get('total')
+
+            if progress_callback:
+                progress_callback(start, total)
+
+            if len(data) < self.page_size or (total is not None and start >= int(total)):
+                break
+
+            if reached_old and self._is_sorted_desc(data):
+                break
+
+        with self._lock:
+            if incremental:
+                self._rows.update(fetched_rows)
+            else:
+                self._rows = fetched_rows
+
+            self._watermark = newest
+            self._last_sync = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._rebuild_index()
+            self.save()
+
+        logger.info(f"价格库同步完成，更新 {len(fetched_rows)} 条")
+        return len(fetched_rows)
+
+    def _is_sorted_desc(self, rows: List[dict]) -> bool:
+        """判断服务端是否按更新时间倒序返回"""
+        dates = [self._date_key(row.get(self.sort_field)) for row in rows]
+        return all(a >= b for a, b in zip(dates, dates[1:]))
+
+    def clear(self):
+        """清空价格库"""
+        with self._lock:
+            self._rows = {}
+            self._watermark = ''
+            self._last_sync = ''
+            self._rebuild_index()
+
+            if self.catalog_file.exists():
+                self.catalog_file.unlink()
+
+        logger.info("价格库已清空")
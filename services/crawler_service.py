@@ -8,7 +8,6 @@ import time
 import logging
 import requests
 from typing import Optional, List, Tuple
-from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from config import WEBSITE_CONFIG, CRAWLER_CONFIG
@@ -17,6 +16,12 @@ from models import ProductFeatures
 logger = logging.getLogger(__name__)
 
 
+def _parse_html(text: str):
+    """解析网页；bs4 只在第一次爬取时导入"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(text, 'html.parser')
+
+
 class CrawlerService:
     """产品参数爬虫服务"""
     
@@ -196,7 +201,7 @@ class CrawlerService:
             response.raise_for_status()
             time.sleep(self.request_delay)
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = _parse_html(response.text)
             
             results = []
             
@@ -256,7 +261,7 @@ class CrawlerService:
             response.raise_for_status()
             time.sleep(self.request_delay)
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = _parse_html(response.text)
             
             features = ProductFeatures(
                 product_model=model,
@@ -331,7 +336,7 @@ class CrawlerService:
             
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = _parse_html(response.text)
             
             feature_div = soup.find('div', id='smbproductFeature')
             if not feature_div:
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+库存缓存服务
+"""
+
+import time
+import threading
+from typing import Optional, List, Dict, Tuple
+
+from config import INVENTORY_CACHE_CONFIG
+from models import InventoryInfo
+
+
+class InventoryCacheService:
+    """库存短期缓存（内存，按型号索引）"""
+
+    def __init__(self, ttl: int = None):
+        self.ttl = ttl if ttl is not None else INVENTORY_CACHE_CONFIG['ttl']
+        self._entries: Dict[str, Tuple[float, List[InventoryInfo]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(model: str) -> str:
+        return (model or '').strip().upper()
+
+    def get(self, model: str, allow_stale: bool = False) -> Optional[Tuple[List[InventoryInfo], float]]:
+        """
+        获取缓存的库存
+
+        Args:
+            model: 产品型号
+            allow_stale: 是否返回已过期的条目
+
+        Returns:
+            (库存列表, 缓存时长秒数)，未命中返回None
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(model))
+
+        if entry is None:
+            return None
+
+        cached_at, inventory_list = entry
+        age = time.time() - cached_at
+
+        if not allow_stale and age >= self.ttl:
+            return None
+
+        return list(inventory_list), age
+
+    def is_fresh(self, age: float) -> bool:
+        """缓存时长是否仍在有效期内"""
+        return age < self.ttl
+
+    def set(self, model: str, inventory_list: List[InventoryInfo]):
+        """写入缓存"""
+        with self._lock:
+            self._entries[self._key(model)] = (time.time(), list(inventory_list))
+
+    def invalidate(self, model: str = None):
+        """清除指定型号或全部缓存"""
+        with self._lock:
+            if model is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._key(model), None)
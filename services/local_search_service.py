@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+本地型号搜索服务
+"""
+
+import bisect
+import logging
+import re
+import threading
+from typing import List, Dict, Tuple, Optional
+
+from models import ProductInfo
+
+logger = logging.getLogger(__name__)
+
+_ASCII_TOKEN = re.compile(r'[A-Za-z0-9]+')
+_CJK_RUN = re.compile(r'[\u4e00-\u9fff]+')
+_SEPARATOR = re.compile(r'[^0-9A-Za-z\u4e00-\u9fff]+')
+
+# 匹配等级，越小越靠前
+RANK_EXACT = 0
+RANK_MODEL_PREFIX = 1
+RANK_SEGMENT_PREFIX = 2
+RANK_NAME = 3
+
+
+def normalize_model(text: str) -> str:
+    """
+    规范化型号：转大写并去掉分隔符
+
+    TL-SG1008D -> TLSG1008D, tl sg1008d -> TLSG1008D
+    """
+    return ''.join(c for c in (text or '').upper() if c.isalnum())
+
+
+def _model_keys(model_upper: str) -> List[str]:
+    """
+    型号的检索键：完整型号，以及从每个分隔符之后开始的后缀
+
+    TL-SG1008D -> TLSG1008D, SG1008D，输入 SG1008 也能按前缀命中。
+    """
+    parts = [p for p in _SEPARATOR.split(model_upper) if p]
+    return [''.join(parts[i:]) for i in range(len(parts))]
+
+
+class _Index:
+    """一次构建的只读索引，替换时整体换掉，搜索线程无需加锁"""
+
+    __slots__ = ('models', 'names', 'normalized', 'texts', 'model_keys', 'model_ids', 'tokens', 'token_ids', 'grams')
+
+    def __init__(self, products: List[Tuple[str, str]]):
+        self.models = [model for model, _ in products]
+        self.names = [name for _, name in products]
+        self.normalized = [normalize_model(model) for model, _ in products]
+        self.texts = [f'{model} {name}'.upper() for model, name in products]
+
+        model_pairs = []
+        token_pairs = set()
+        grams: Dict[str, set] = {}
+
+        for i, (model, name) in enumerate(products):
+            for key in _model_keys(model.upper()):
+                model_pairs.append((key, i))
+
+            for token in _ASCII_TOKEN.findall(name):
+                token_pairs.add((token.upper(), i))
+
+            # 中文按单字和相邻两字建倒排，查询时取交集后再核对子串
+            for run in _CJK_RUN.findall(self.texts[i]):
+                for j, char in enumerate(run):
+                    grams.setdefault(char, set()).add(i)
+                    if j + 1 < len(run):
+                        grams.setdefault(run[j:j + 2], set()).add(i)
+
+        model_pairs.sort()
+        self.model_keys = [key for key, _ in model_pairs]
+        self.model_ids = [i for _, i in model_pairs]
+
+        token_pairs = sorted(token_pairs)
+        self.tokens = [token for token, _ in token_pairs]
+        self.token_ids = [i for _, i in token_pairs]
+
+        self.grams = grams
+
+    @staticmethod
+    def _prefix(keys: List[str], ids: List[int], prefix: str):
+        pos = bisect.bisect_left(keys, prefix)
+        while pos < len(keys) and keys[pos].startswith(prefix):
+            yield keys[pos], ids[pos]
+            pos += 1
+
+    def _cjk_matches(self, run: str) -> set:
+        if len(run) == 1:
+            return set(self.grams.get(run, ()))
+
+        candidates = None
+        for j in range(len(run) - 1):
+            ids = self.grams.get(run[j:j + 2])
+            if not ids:
+                return set()
+            candidates = set(ids) if candidates is None else candidates & ids
+
+        texts = self.texts
+        return {i for i in candidates if run in texts[i]}
+
+    def match_term(self, term: str) -> Dict[int, int]:
+        """单个关键词的匹配结果 {条目下标: 匹配等级}"""
+        normalized = normalize_model(term)
+        if not normalized:
+            return {}
+
+        ranks: Dict[int, int] = {}
+
+        def hit(i, rank):
+            if rank < ranks.get(i, RANK_NAME + 1):
+                ranks[i] = rank
+
+        # 型号：规范化后的完整型号或分段后缀前缀匹配
+        for key, i in self._prefix(self.model_keys, self.model_ids, normalized):
+            if self.normalized[i] == key:
+                hit(i, RANK_EXACT if key == normalized else RANK_MODEL_PREFIX)
+            else:
+                hit(i, RANK_SEGMENT_PREFIX)
+
+        # 名称：英文/数字词前缀匹配，中文子串匹配；关键词中的每一段都要命中
+        name_ids = None
+        for token in _ASCII_TOKEN.findall(term):
+            ids = {i for _, i in self._prefix(self.tokens, self.token_ids, token.upper())}
+            name_ids = ids if name_ids is None else name_ids & ids
+        for run in _CJK_RUN.findall(term):
+            ids = self._cjk_matches(run)
+            name_ids = ids if name_ids is None else name_ids & ids
+
+        for i in name_ids or ():
+            hit(i, RANK_NAME)
+
+        return ranks
+
+    def search(self, query: str, limit: int) -> List[int]:
+        terms = query.split()
+        if not terms:
+            return []
+
+        ranks = self.match_term(terms[0])
+        for term in terms[1:]:
+            other = self.match_term(term)
+            ranks = {i: max(rank, other[i]) for i, rank in ranks.items() if i in other}
+
+        models = self.models
+        ordered = sorted(ranks, key=lambda i: (ranks[i], len(models[i]), models[i]))
+        return ordered[:limit] if limit else ordered
+
+
+class LocalSearchService:
+    """
+    基于产品参数缓存（product_cache.json）的本地搜索
+
+    缓存中有全部官网型号和名称，但没有价格。搜索在内存索引上完成，用于
+    在 CRM 请求返回之前先显示结果。支持：
+    - 型号前缀，忽略大小写和分隔符（tlsg10 -> TL-SG1008D）
+    - 从型号中间的分段开始的前缀（SG1008 -> TL-SG1008D）
+    - 名称中的英文词前缀和中文子串（"千兆 交换机"）
+    """
+
+    def __init__(self, cache_service):
+        self.cache_service = cache_service
+        self._index: Optional[_Index] = None
+        self._version = None
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+
+    def _is_current(self) -> bool:
+        return self._index is not None and self._version == self.cache_service.version
+
+    def _ensure_index(self) -> _Index:
+        if self._is_current():
+            return self._index
+
+        with self._lock:
+            if not self._is_current():
+                # 先加载再取版本号：加载本身会增加 version，之后的 set() 会再触发重建
+                self.cache_service.ensure_loaded()
+                version = self.cache_service.version
+                products = self.cache_service.list_products()
+                self._index = _Index(products)
+                self._version = version
+                logger.info(f"本地搜索索引已建立，共 {len(products)} 个型号")
+            return self._index
+
+    def _rebuild_in_background(self):
+        """后台重建索引，同时只重建一次；重建完成前搜索继续使用旧索引"""
+        # 不等待 _lock：预热正在建立索引时调用线程（UI 线程）不能被阻塞
+        if not self._rebuild_lock.acquire(blocking=False):
+            return
+
+        def worker():
+            try:
+                self._ensure_index()
+            except Exception as e:
+                logger.warning(f"重建本地搜索索引失败: {e}")
+            finally:
+                self._rebuild_lock.release()
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def warm_up(self):
+        """提前加载缓存并建立索引（在后台线程中调用）"""
+        self._ensure_index()
+
+    def search(self, keyword: str, limit: int = 50) -> List[ProductInfo]:
+        """
+        本地搜索
+
+        Args:
+            keyword: 型号或名称关键字，空格分隔的多个关键字需同时命中
+            limit: 返回数量限制
+
+        不会在调用线程上加载缓存或建立索引：索引过期时用旧索引搜索并在
+        后台重建，索引尚未建立时返回空列表。
+
+        Returns:
+            只有型号和名称的 ProductInfo 列表，按匹配程度排序
+        """
+        query = (keyword or '').strip()
+        if not query:
+            return []
+
+        index = self._index
+        if not self._is_current():
+            self._rebuild_in_background()
+        if index is None:
+            return []
+
+        query_upper = query.upper()
+
+        return [
+            ProductInfo(
+                product_model=index.models[i],
+                product_name=index.names[i],
+                is_exact_match=index.models[i].upper() == query_upper,
+            )
+            for i in index.search(query, limit)
+        ]
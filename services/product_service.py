@@ -3,112 +3,402 @@
 产品查询服务
 """
 
+import json
 import time
+import asyncio
 import logging
-from typing import List, Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import fields
+from typing import List, Dict, Optional, Iterator, Iterable, Tuple
 
-from config import CRM_CONFIG, PRICE_QUERY_FIELDS
-from models import ProductInfo, InventoryInfo
+from config import CRM_CONFIG, QUERY_CONFIG, PRICE_QUERY_FIELDS, SEARCH_CACHE_CONFIG, CATALOG_CONFIG
+from models import ProductInfo, InventoryInfo, PriceLadder, QuoteLine
 from services.auth_service import AuthService
-from utils import calculate_discount_prices
+from services.search_cache_service import SearchCacheService
+from services.catalog_service import CatalogService
+from services.inventory_cache_service import InventoryCacheService
+from services.snapshot_service import SnapshotService
+from services.local_search_service import LocalSearchService
+from utils import calculate_discount_prices_batch, to_price
 
 logger = logging.getLogger(__name__)
 
+_KEEP_DEFAULT = object()
+
+
+def _convert_price(raw_value):
+    if not raw_value:
+        return _KEEP_DEFAULT
+    try:
+        return float(raw_value)
+    except (ValueError, TypeError):
+        return raw_value
+
+
+def _convert_qty(raw_value):
+    if not raw_value:
+        return _KEEP_DEFAULT
+    try:
+        return int(raw_value)
+    except (ValueError, TypeError):
+        return raw_value
+
+
+def _convert_id(raw_value):
+    return int(raw_value) if raw_value else 0
+
+
+_FIELD_CONVERTERS = {
+    'product_id': _convert_id,
+    'line_id': _convert_id,
+    'valid': bool,
+}
+
+_PRODUCT_FIELDS = {f.name for f in fields(ProductInfo)}
+
+
+def _build_field_converters(field_map: dict) -> list:
+    """根据字段映射生成 (属性名, 接口字段, 转换函数) 表，转换函数为None表示原样赋值"""
+    converters = []
+    for field_name, field_key in field_map.items():
+        name = field_name.lower()
+        if 'price' in name:
+            convert = _convert_price
+        elif 'qty' in name:
+            convert = _convert_qty
+        elif field_name in _PRODUCT_FIELDS:
+            convert = _FIELD_CONVERTERS.get(field_name)
+        else:
+            continue
+        converters.append((field_name, field_key, convert))
+    return converters
+
+
+_PRICE_FIELD_CONVERTERS = _build_field_converters(PRICE_QUERY_FIELDS)
+
 
 class ProductService:
     """产品查询服务"""
     
-    def __init__(self, auth_service: AuthService):
+    def __init__(self, auth_service: AuthService, search_cache: SearchCacheService = None,
+                 catalog: CatalogService = None, local_search: LocalSearchService = None):
         self.auth = auth_service
         self.price_api = CRM_CONFIG['api_price_query']
         self.inventory_api = CRM_CONFIG['api_inventory_query']
+        
+        if search_cache is None and SEARCH_CACHE_CONFIG['enabled']:
+            search_cache = SearchCacheService()
+        self.search_cache = search_cache
+        self.catalog = catalog if catalog is not None else CatalogService()
+        self.local_search = local_search
+        self.inventory_cache = InventoryCacheService()
+        self.snapshots = SnapshotService()
+        self._async_auth = None
+        
+        self._revalidating = set()
+        self._revalidate_lock = threading.Lock()
+        
+        self._ladders: Dict[str, Tuple[float, PriceLadder]] = {}
+        self._ladder_lock = threading.Lock()
     
-    def search_products(self, model: str, limit: int = 50) -> List[ProductInfo]:
+    def search_products(self, model: str, limit: int = 50, use_cache: bool = True,
+                        revalidate: bool = None, local: bool = False) -> List[ProductInfo]:
         """
         搜索产品
         
         Args:
             model: 产品型号
             limit: 返回数量限制
+            use_cache: 是否使用搜索缓存
+            revalidate: 缓存命中时是否后台刷新，默认取配置
+            local: 是否从离线价格库查询（价格库为空时回退到在线查询）
             
         Returns:
             产品列表
         """
+        if local and self.catalog and self.catalog.is_available():
+            return self.search_local(model, limit)
+        
         logger.info(f"搜索产品: {model}")
         
+        page = self._fetch_price_page(model, 0, limit, use_cache=use_cache, revalidate=revalidate)
+        
+        if page is None:
+            logger.error("产品搜索失败")
+            return self._search_snapshot(model)
+        
+        products = self._deduplicate(self.parse_rows(page['rows'], model))
+        if products:
+            self.snapshots.save_search(model, products)
+        
+        logger.info(f"搜索到 {len(products)} 个产品")
+        return products
+    
+    def _search_snapshot(self, model: str) -> List[ProductInfo]:
+        """CRM 不可用时返回离线快照，结果带 as_of 时间"""
+        snapshot = self.snapshots.get_search(model)
+        if snapshot is None:
+            return []
+        
+        logger.info(f"使用离线快照: {model} (截至 {snapshot.as_of})")
+        return snapshot
+    
+    def preload_local(self):
+        """
+        加载本地数据：搜索缓存、离线价格库和本地搜索索引
+        
+        在后台线程中调用；加载完成前 search_cached 只返回已在内存中的数据。
+        """
+        if self.search_cache:
+            self.search_cache.ensure_loaded()
+        if self.catalog:
+            self.catalog.is_available()
+        if self.local_search:
+            self.local_search.warm_up()
+    
+    def search_cached(self, model: str, limit: int = 50) -> List[ProductInfo]:
+        """
+        只从内存中的本地数据搜索，不发起网络请求
+        
+        优先使用该关键字的搜索缓存（含已过期条目），其次使用离线价格库，
+        都没有结果时使用产品参数缓存的本地索引（只有型号和名称，没有价格）。
+        供 UI 线程在每次输入时调用：不读取文件也不等待锁，尚未由 preload_local
+        加载或正被其他线程占用的数据直接跳过。
+        
+        Args:
+            model: 产品型号
+            limit: 返回数量限制
+            
+        Returns:
+            产品列表，本地无数据时返回空列表
+        """
+        if self.search_cache:
+            entry = self.search_cache.peek(model, limit)
+            if entry is not None:
+                return self._deduplicate(self.parse_rows(entry['rows'], model))
+        
+        if self.catalog:
+            products = self.search_local(model, limit, blocking=False)
+            if products:
+                return products
+        
+        if self.local_search:
+            return self.local_search.search(model, limit)
+        
+        return []
+    
+    def search_local(self, model: str, limit: int = 50, blocking: bool = True) -> List[ProductInfo]:
+        """从离线价格库搜索产品，blocking 为False时不等待价格库加载或同步"""
+        products = self.catalog.search(model, limit, blocking=blocking) if self.catalog else []
+        
+        query_lower = model.lower()
+        for product in products:
+            product.is_exact_match = (product.product_model.lower() == query_lower)
+        
+        products = self._deduplicate(products)
+        
+        logger.info(f"本地价格库搜索到 {len(products)} 个产品")
+        return products
+    
+    def fetch_price_rows(self, start: int, limit: int, blur_value: str = '', sort: list = None) -> Optional[dict]:
+        """
+        直接获取一页原始价格数据（不经过搜索缓存），供价格库同步使用
+        
+        Returns:
+            {'rows': 原始数据行, 'total': 总数}，请求失败返回None
+        """
+        return self._fetch_price_page(blur_value, start, limit, use_cache=False, sort=sort)
+    
+    def iter_search_pages(self, model: str, page_size: int = 50, use_cache: bool = True) -> Iterator[List[ProductInfo]]:
+        """
+        分页搜索产品，按需逐页请求
+        
+        每次迭代返回本页新出现的产品，跨页去重。后续页中出现更低阶梯的
+        同型号数据时，直接更新已返回的产品对象。
+        
+        Args:
+            model: 产品型号
+            page_size: 每页数量
+            use_cache: 是否使用搜索缓存
+            
+        Yields:
+            本页新增的产品列表
+        """
+        logger.info(f"分页搜索产品: {model}")
+        
+        seen: Dict[str, ProductInfo] = {}
+        start = 0
+        
+        while True:
+            page = self._fetch_price_page(model, start, page_size, use_cache=use_cache)
+            
+            if page is None:
+                logger.error(f"产品搜索失败 (start={start})")
+                if start == 0:
+                    snapshot = self._search_snapshot(model)
+                    if snapshot:
+                        yield snapshot
+                return
+            
+            data = page['rows']
+            new_products = []
+            
+            for product in self.parse_rows(data, model):
+                model_key = product.product_model
+                
+                if not model_key:
+                    continue
+                
+                existing = seen.get(model_key)
+                if existing is None:
+                    seen[model_key] = product
+                    new_products.append(product)
+                elif product.start_qty < existing.start_qty:
+                    for f in fields(ProductInfo):
+                        setattr(existing, f.name, getattr(product, f.name))
+            
+            if start == 0 and new_products:
+                self.snapshots.save_search(model, new_products)
+            
+            start += len(data)
+            
+            if new_products:
+                yield new_products
+            
+            total = page.get('total')
+            if len(data) < page_size or (total is not None and start >= int(total)):
+                return
+    
+    def _fetch_price_page(self, model: str, start: int, limit: int, use_cache: bool = True,
+                          revalidate: bool = None, sort: list = None) -> Optional[dict]:
+        """
+        获取一页价格数据，优先读取搜索缓存
+        
+        Returns:
+            {'rows': 原始数据行, 'total': 总数}，请求失败返回None
+        """
+        if use_cache:
+            cached = self._cached_price_page(model, start, limit)
+            if cached is not None:
+                if revalidate is None:
+                    revalidate = SEARCH_CACHE_CONFIG['revalidate']
+                if revalidate:
+                    self._revalidate_in_background(model, start, limit)
+                return cached
+        
+        result = self.auth.get(self.price_api, params=self._price_params(model, start, limit, sort))
+        
+        return self._store_price_page(result, model, start, limit, sort)
+    
+    def _cached_price_page(self, model: str, start: int, limit: int) -> Optional[dict]:
+        """读取搜索缓存中未过期的页"""
+        if not self.search_cache:
+            return None
+        
+        entry = self.search_cache.get(model, limit, start)
+        if entry is None:
+            return None
+        
+        logger.info(f"搜索缓存命中: {model}")
+        return {'rows': entry['rows'], 'total': entry.get('total')}
+    
+    def _price_params(self, model: str, start: int, limit: int, sort: list = None) -> dict:
+        """构造价格查询参数"""
         params = {
             '_dc': int(time.time() * 1000),
             'blurValue': model,
             'undefined': 'on',
-            'start': 0,
+            'start': start,
             'limit': limit
         }
         
-        result = self.auth.get(self.price_api, params=params)
+        if sort:
+            params['sort'] = json.dumps(sort)
         
+        return params
+    
+    def _store_price_page(self, result: Optional[dict], model: str, start: int, limit: int,
+                          sort: list = None) -> Optional[dict]:
+        """解包价格查询响应并写入搜索缓存"""
         if not result:
-            logger.error("产品搜索失败")
-            return []
+            return None
         
         data = result.get('results', result.get('data', result.get('list', [])))
+        total = result.get('total', result.get('totalCount'))
         
-        products = []
-        for item in data:
-            product = self._parse_product(item, model)
-            products.append(product)
+        # 空结果不缓存：服务端短暂异常时返回的空页不能在整个有效期内遮住结果
+        if self.search_cache and not sort and data:
+            self.search_cache.set(model, limit, data, total=total, start=start)
         
-        products = self._deduplicate(products)
+        return {'rows': data, 'total': total}
+    
+    def _revalidate_in_background(self, model: str, start: int, limit: int):
+        """后台刷新缓存条目，同一条目同时只刷新一次"""
+        key = SearchCacheService.make_key(model, limit, start)
         
-        logger.info(f"搜索到 {len(products)} 个产品")
-        return products
+        with self._revalidate_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+        
+        def worker():
+            try:
+                self._fetch_price_page(model, start, limit, use_cache=False)
+            except Exception as e:
+                logger.warning(f"后台刷新搜索缓存失败: {e}")
+            finally:
+                with self._revalidate_lock:
+                    self._revalidating.discard(key)
+        
+        threading.Thread(target=worker, daemon=True).start()
     
     def _parse_product(self, raw_data: dict, query_model: str) -> ProductInfo:
         """解析产品数据"""
-        product = ProductInfo()
+        return self.parse_rows([raw_data], query_model)[0]
+    
+    def parse_rows(self, rows: List[dict], query_model: str) -> List[ProductInfo]:
+        """
+        批量解析产品数据
+        
+        按预先生成的字段转换表逐行构造 ProductInfo，折扣价整批计算。
         
-        for field_name, field_key in PRICE_QUERY_FIELDS.items():
-            raw_value = raw_data.get(field_key, '')
+        Args:
+            rows: CRM 原始数据行
+            query_model: 查询型号，用于判断精确匹配
             
-            if 'price' in field_name.lower() and raw_value:
-                try:
-                    setattr(product, field_name, float(raw_value))
-                except (ValueError, TypeError):
-                    setattr(product, field_name, raw_value)
-            elif 'qty' in field_name.lower() and raw_value:
-                try:
-                    setattr(product, field_name, int(raw_value))
-                except (ValueError, TypeError):
-                    setattr(product, field_name, raw_value)
-            elif field_name == 'product_model':
-                product.product_model = raw_value
-            elif field_name == 'product_name':
-                product.product_name = raw_value
-            elif field_name == 'product_id':
-                product.product_id = int(raw_value) if raw_value else 0
-            elif field_name == 'line_id':
-                product.line_id = int(raw_value) if raw_value else 0
-            elif field_name == 'brand':
-                product.brand = raw_value
-            elif field_name == 'series':
-                product.series = raw_value
-            elif field_name == 'life_cycle':
-                product.life_cycle = raw_value
-            elif field_name == 'life_cycle_meaning':
-                product.life_cycle_meaning = raw_value
-            elif field_name == 'business_discount':
-                product.business_discount = raw_value
-            elif field_name == 'valid':
-                product.valid = bool(raw_value)
-            elif field_name == 'last_update_date':
-                product.last_update_date = raw_value
-        
-        product.is_exact_match = (product.product_model.lower() == query_model.lower())
-        
-        high_price, low_price = calculate_discount_prices(product.price, product.business_discount)
-        product.high_discount_price = high_price
-        product.low_discount_price = low_price
-        
-        return product
+        Returns:
+            产品列表
+        """
+        converters = _PRICE_FIELD_CONVERTERS
+        query_lower = query_model.lower()
+        products = []
+        
+        for raw_data in rows:
+            get = raw_data.get
+            values = {}
+            
+            for field_name, field_key, convert in converters:
+                raw_value = get(field_key, '')
+                if convert is None:
+                    values[field_name] = raw_value
+                else:
+                    value = convert(raw_value)
+                    if value is not _KEEP_DEFAULT:
+                        values[field_name] = value
+            
+            product = ProductInfo(**values)
+            product.is_exact_match = (product.product_model.lower() == query_lower)
+            products.append(product)
+        
+        highs, lows = calculate_discount_prices_batch(
+            [p.price for p in products], [p.business_discount for p in products]
+        )
+        for product, high, low in zip(products, highs, lows):
+            product.high_discount_price = high
+            product.low_discount_price = low
+        
+        return products
     
     def _deduplicate(self, products: List[ProductInfo]) -> List[ProductInfo]:
         """去重，保留最低阶梯价格"""
@@ -127,19 +417,203 @@ class ProductService:
         
         return list(product_map.values())
     
-    def query_inventory(self, model: str) -> List[InventoryInfo]:
+    def _store_ladder(self, key: str, tiers: List[ProductInfo]) -> Optional[PriceLadder]:
+        """用型号的完整阶梯行建立价格阶梯并缓存，有效期与搜索缓存相同"""
+        if not tiers:
+            return None
+        
+        ladder = PriceLadder(tiers[0].product_model, tiers)
+        with self._ladder_lock:
+            self._ladders[key] = (time.time(), ladder)
+        return ladder
+    
+    def _fetch_ladder_tiers(self, model: str) -> Optional[List[ProductInfo]]:
+        """
+        在线查询型号的全部阶梯行
+        
+        不使用搜索缓存；翻完所有页，只保留型号完全相同的行，
+        避免模糊搜索返回的相似型号或不完整的页混入阶梯。
+        
+        Returns:
+            阶梯行列表，请求失败返回None
+        """
+        key = model.upper()
+        page_size = CATALOG_CONFIG['page_size']
+        tiers = []
+        start = 0
+        
+        while True:
+            page = self._fetch_price_page(model, start, page_size, use_cache=False)
+            if page is None:
+                return None
+            
+            data = page['rows']
+            tiers.extend(p for p in self.parse_rows(data, model) if p.product_model.upper() == key)
+            start += len(data)
+            
+            total = page.get('total')
+            if len(data) < page_size or (total is not None and start >= int(total)):
+                return tiers
+    
+    def get_price_ladder(self, model: str, fetch: bool = True) -> Optional[PriceLadder]:
+        """
+        获取型号的价格阶梯
+        
+        阶梯只由型号精确匹配的完整数据建立：未过期的已建阶梯、离线价格库，
+        都没有时按型号在线查询全部阶梯。已建阶梯的有效期与搜索缓存相同。
+        
+        Args:
+            model: 产品型号
+            fetch: 本地没有时是否在线查询
+            
+        Returns:
+            PriceLadder，找不到返回None
+        """
+        key = (model or '').strip().upper()
+        if not key:
+            return None
+        
+        with self._ladder_lock:
+            entry = self._ladders.get(key)
+        if entry is not None:
+            built_at, ladder = entry
+            if time.time() - built_at < SEARCH_CACHE_CONFIG['ttl']:
+                return ladder
+        
+        if self.catalog and self.catalog.is_available():
+            ladder = self._store_ladder(key, self.catalog.get_tiers(key))
+            if ladder is not None:
+                return ladder
+        
+        if fetch:
+            tiers = self._fetch_ladder_tiers(model.strip())
+            if tiers is None:
+                logger.error(f"价格阶梯查询失败: {model}")
+            return self._store_ladder(key, tiers or [])
+        
+        return None
+    
+    def quote(self, items: Iterable[Tuple[str, int]], fetch: bool = True,
+              max_workers: int = None) -> List[QuoteLine]:
+        """
+        按数量阶梯为整张物料清单报价
+        
+        本地没有价格阶梯的型号会并发在线搜索，每个型号只请求一次。
+        
+        Args:
+            items: (型号, 数量) 序列
+            fetch: 本地没有时是否在线搜索
+            max_workers: 在线搜索的最大并发数，默认取配置
+            
+        Returns:
+            与 items 顺序一致的报价行，找不到价格或阶梯价格无效的行 found 为False；
+            数量低于最低起订量的行 below_min_qty 为True
+        """
+        items = [((model or '').strip(), int(qty or 0)) for model, qty in items]
+        unique_models = list(dict.fromkeys(model for model, _ in items if model))
+        
+        ladders = {model: self.get_price_ladder(model, fetch=False) for model in unique_models}
+        missing = [model for model, ladder in ladders.items() if ladder is None]
+        
+        if missing and fetch:
+            logger.info(f"报价: 在线查询 {len(missing)} 个型号")
+            workers = min(max_workers or QUERY_CONFIG['concurrent_queries'], len(missing))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for model, ladder in zip(missing, executor.map(self.get_price_ladder, missing)):
+                    ladders[model] = ladder
+        
+        lines = []
+        for model, qty in items:
+            ladder = ladders.get(model)
+            tier = ladder.tier_for(qty) if ladder is not None else None
+            
+            if tier is None:
+                lowest = ladder.lowest_tier if ladder is not None else None
+                if lowest is not None and qty < (lowest.start_qty or 0):
+                    # 低于最低起订量：不按最低阶梯计价，标出起订量
+                    lines.append(QuoteLine(
+                        product_model=lowest.product_model,
+                        quantity=qty,
+                        product_name=lowest.product_name,
+                        start_qty=lowest.start_qty,
+                        below_min_qty=True,
+                    ))
+                else:
+                    lines.append(QuoteLine(product_model=model, quantity=qty))
+                continue
+            
+            unit_price = to_price(tier.price)
+            if unit_price is None:
+                # 阶梯存在但价格不是有效数字（未转换的原始值）：不计价，标为未找到
+                lines.append(QuoteLine(
+                    product_model=tier.product_model,
+                    quantity=qty,
+                    product_name=tier.product_name,
+                    start_qty=tier.start_qty,
+                    end_qty=tier.end_qty,
+                ))
+                continue
+            
+            lines.append(QuoteLine(
+                product_model=tier.product_model,
+                quantity=qty,
+                found=True,
+                product_name=tier.product_name,
+                unit_price=unit_price,
+                amount=unit_price * qty,
+                start_qty=tier.start_qty,
+                end_qty=tier.end_qty,
+                high_discount_price=tier.high_discount_price,
+                low_discount_price=tier.low_discount_price,
+            ))
+        
+        return lines
+    
+    def query_inventory(self, model: str, force_refresh: bool = False,
+                        record_usage: bool = True) -> List[InventoryInfo]:
         """
         查询库存
         
         Args:
             model: 产品型号
+            force_refresh: 是否忽略库存缓存
+            record_usage: 是否计入常用型号的查询次数（预取时不计入）
             
         Returns:
             库存列表
         """
+        if record_usage:
+            self.snapshots.record_usage(model)
+        
+        if not force_refresh:
+            cached = self.inventory_cache.get(model)
+            if cached is not None:
+                logger.info(f"库存缓存命中: {model}")
+                return cached[0]
+        
+        inventory_list = self._fetch_inventory(model)
+        return inventory_list if inventory_list is not None else self._inventory_snapshot(model)
+    
+    def _inventory_snapshot(self, model: str) -> List[InventoryInfo]:
+        """CRM 不可用时返回库存离线快照，结果带 as_of 时间"""
+        snapshot = self.snapshots.get_inventory(model)
+        if snapshot is None:
+            return []
+        
+        logger.info(f"使用库存离线快照: {model} (截至 {snapshot.as_of})")
+        return snapshot
+    
+    def _fetch_inventory(self, model: str) -> Optional[List[InventoryInfo]]:
+        """请求库存数据并写入缓存，请求失败返回None"""
         logger.info(f"查询库存: {model}")
         
-        params = {
+        result = self.auth.get(self.inventory_api, params=self._inventory_params(model))
+        
+        return self._store_inventory(result, model)
+    
+    def _inventory_params(self, model: str) -> dict:
+        """构造库存查询参数"""
+        return {
             '_dc': int(time.time() * 1000),
             'blurValue': '',
             'invIdList': '',
@@ -151,12 +625,12 @@ class ProductService:
             'showPrice': 'true',
             'start': 0
         }
-        
-        result = self.auth.get(self.inventory_api, params=params)
-        
+    
+    def _store_inventory(self, result: Optional[dict], model: str) -> Optional[List[InventoryInfo]]:
+        """解析库存查询响应并写入缓存，请求失败返回None"""
         if not result:
             logger.error("库存查询失败")
-            return []
+            return None
         
         data = result.get('results', result.get('data', result.get('list', [])))
         
@@ -180,5 +654,234 @@ class ProductService:
             )
             inventory_list.append(inventory)
         
+        self.inventory_cache.set(model, inventory_list)
+        self.snapshots.save_inventory(model, inventory_list)
+        
         logger.info(f"查询到 {len(inventory_list)} 条库存记录")
         return inventory_list
+    
+    def get_cached_inventory(self, model: str) -> Optional[tuple]:
+        """
+        获取缓存的库存（含已过期条目）
+        
+        Returns:
+            (库存列表, 缓存时长秒数)，无缓存返回None
+        """
+        return self.inventory_cache.get(model, allow_stale=True)
+    
+    def cached_stock(self, model: str) -> Optional[int]:
+        """
+        本地已知的库存总数（库存缓存，含已过期条目），不发起网络请求
+        
+        Returns:
+            库存总数，未查询过返回None
+        """
+        cached = self.inventory_cache.get(model, allow_stale=True)
+        if cached is None:
+            return None
+        
+        inventory_list, _ = cached
+        return sum(inv.quantity or 0 for inv in inventory_list)
+    
+    def refresh_inventory_async(self, model: str, callback=None):
+        """
+        后台强制刷新库存，同一型号同时只刷新一次
+        
+        Args:
+            model: 产品型号
+            callback: 完成回调 callback(inventory_list)，在后台线程中调用，
+                      刷新失败时 inventory_list 为None
+        """
+        key = 'inv|' + model.strip().upper()
+        
+        with self._revalidate_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+        
+        def worker():
+            inventory_list = None
+            try:
+                inventory_list = self._fetch_inventory(model)
+            except Exception as e:
+                logger.warning(f"后台刷新库存失败: {e}")
+            finally:
+                with self._revalidate_lock:
+                    self._revalidating.discard(key)
+            
+            if callback:
+                callback(inventory_list)
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def query_inventories(self, models: List[str], max_workers: int = None,
+                          force_refresh: bool = False, record_usage: bool = True) -> Dict[str, List[InventoryInfo]]:
+        """
+        并发查询多个型号的库存
+        
+        请求共用 AuthService 的连接池，并发数受 max_workers 限制。
+        
+        Args:
+            models: 产品型号列表
+            max_workers: 最大并发数，默认取配置
+            force_refresh: 是否忽略库存缓存
+            record_usage: 是否计入常用型号的查询次数
+            
+        Returns:
+            {型号: 库存列表}，查询失败的型号对应空列表
+        """
+        unique_models = list(dict.fromkeys(m for m in models if m))
+        if not unique_models:
+            return {}
+        
+        max_workers = max_workers or QUERY_CONFIG['concurrent_queries']
+        max_workers = min(max_workers, len(unique_models))
+        
+        logger.info(f"批量查询库存: {len(unique_models)} 个型号，并发数: {max_workers}")
+        
+        results = {}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.query_inventory, model, force_refresh, record_usage): model
+                for model in unique_models
+            }
+            
+            for future in as_completed(futures):
+                model = futures[future]
+                try:
+                    results[model] = future.result()
+                except Exception as e:
+                    logger.warning(f"库存查询异常 {model}: {e}")
+                    results[model] = []
+        
+        return {model: results[model] for model in unique_models}
+    
+    def prefetch_usual_models(self, limit: int = None) -> int:
+        """
+        预取常用型号的价格和库存，写入离线快照
+        
+        Args:
+            limit: 预取的型号数量，默认取配置
+            
+        Returns:
+            预取的型号数量
+        """
+        models = self.snapshots.get_usual_models(limit)
+        if not models:
+            return 0
+        
+        logger.info(f"预取常用型号: {len(models)} 个")
+        
+        with ThreadPoolExecutor(max_workers=min(QUERY_CONFIG['concurrent_queries'], len(models))) as executor:
+            list(executor.map(lambda m: self.search_products(m, use_cache=False), models))
+        
+        # 预取不计入查询次数，否则每次预取都会抬高被预取型号的次数
+        self.query_inventories(models, force_refresh=True, record_usage=False)
+        self.snapshots.flush()
+        
+        return len(models)
+    
+    def flush(self):
+        """立即写入延迟保存的搜索缓存和离线快照（应用暂停或退出时调用）"""
+        if self.search_cache:
+            self.search_cache.flush()
+        self.snapshots.flush()
+    
+    @property
+    def async_auth(self):
+        """与同步 AuthService 共享登录状态的异步客户端，首次使用时创建"""
+        if self._async_auth is None:
+            from services.async_auth_service import AsyncAuthService
+            self._async_auth = AsyncAuthService.from_auth_service(self.auth)
+        return self._async_auth
+    
+    async def aclose(self):
+        """
+        关闭异步客户端的连接池会话
+
+        异步接口应在同一个事件循环内使用完毕后关闭，如:
+            async def main():
+                try:
+                    await service.search_products_async('TL-SG1008')
+                finally:
+                    await service.aclose()
+        """
+        if self._async_auth is not None:
+            await self._async_auth.aclose()
+    
+    async def search_products_async(self, model: str, limit: int = 50, use_cache: bool = True) -> List[ProductInfo]:
+        """
+        搜索产品（异步）
+        
+        Args:
+            model: 产品型号
+            limit: 返回数量限制
+            use_cache: 是否使用搜索缓存
+            
+        Returns:
+            产品列表
+        """
+        logger.info(f"搜索产品（异步）: {model}")
+        
+        page = self._cached_price_page(model, 0, limit) if use_cache else None
+        
+        if page is None:
+            result = await self.async_auth.get(self.price_api, params=self._price_params(model, 0, limit))
+            page = self._store_price_page(result, model, 0, limit)
+        
+        if page is None:
+            logger.error("产品搜索失败")
+            return self._search_snapshot(model)
+        
+        products = self._deduplicate(self.parse_rows(page['rows'], model))
+        if products:
+            self.snapshots.save_search(model, products)
+        return products
+    
+    async def query_inventory_async(self, model: str, force_refresh: bool = False) -> List[InventoryInfo]:
+        """
+        查询库存（异步）
+        
+        Args:
+            model: 产品型号
+            force_refresh: 是否忽略库存缓存
+            
+        Returns:
+            库存列表
+        """
+        if not force_refresh:
+            cached = self.inventory_cache.get(model)
+            if cached is not None:
+                return cached[0]
+        
+        logger.info(f"查询库存（异步）: {model}")
+        
+        result = await self.async_auth.get(self.inventory_api, params=self._inventory_params(model))
+        inventory_list = self._store_inventory(result, model)
+        return inventory_list if inventory_list is not None else self._inventory_snapshot(model)
+    
+    async def query_inventories_async(self, models: List[str], max_concurrency: int = None) -> Dict[str, List[InventoryInfo]]:
+        """
+        并发查询多个型号的库存（异步）
+        
+        Args:
+            models: 产品型号列表
+            max_concurrency: 最大并发请求数，默认取配置
+            
+        Returns:
+            {型号: 库存列表}
+        """
+        unique_models = list(dict.fromkeys(m for m in models if m))
+        semaphore = asyncio.Semaphore(max_concurrency or QUERY_CONFIG.get('async_connection_limit', 100))
+        
+        async def query(model):
+            async with semaphore:
+                return await self.query_inventory_async(model)
+        
+        results = await asyncio.gather(*(query(m) for m in unique_models), return_exceptions=True)
+        
+        return {
+            model: result if not isinstance(result, BaseException) else []
+            for model, result in zip(unique_models, results)
+        }
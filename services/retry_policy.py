@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+请求重试策略与熔断器
+"""
+
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from config import QUERY_CONFIG
+
+
+class RetryPolicy:
+    """
+    重试策略
+
+    - 指数退避 + 全抖动：第 n 次重试前等待 uniform(0, min(backoff_max, backoff_base * 2^n)) 秒
+    - 服务端返回 Retry-After 时按其等待（不超过 retry_after_max）
+    - 只有 retry_statuses 中的状态码和网络异常会重试，其他状态码立即失败
+    """
+
+    def __init__(self, max_retries: int = None, backoff_base: float = None, backoff_max: float = None,
+                 retry_after_max: float = None, retry_statuses=None):
+        self.max_retries = max_retries or QUERY_CONFIG['max_retries']
+        self.backoff_base = backoff_base if backoff_base is not None else QUERY_CONFIG['backoff_base']
+        self.backoff_max = backoff_max if backoff_max is not None else QUERY_CONFIG['backoff_max']
+        self.retry_after_max = retry_after_max if retry_after_max is not None else QUERY_CONFIG['retry_after_max']
+        self.retry_statuses = frozenset(retry_statuses or QUERY_CONFIG['retry_statuses'])
+
+    def should_retry_status(self, status_code: int) -> bool:
+        """该状态码是否值得重试"""
+        return status_code in self.retry_statuses
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        计算第 attempt 次失败后的等待时间
+
+        Args:
+            attempt: 已失败的次数（从0开始）
+            retry_after: 服务端要求的等待秒数
+
+        Returns:
+            等待秒数
+        """
+        if retry_after is not None:
+            return max(0.0, min(retry_after, self.retry_after_max))
+
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    @staticmethod
+    def parse_retry_after(value) -> Optional[float]:
+        """解析 Retry-After 头（秒数或 HTTP 日期）"""
+        if not value:
+            return None
+
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+        return (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败 failure_threshold 次后熔断，熔断期间请求直接失败；
+    reset_timeout 秒后放行一个探测请求，成功则恢复，失败则继续熔断。
+    探测请求没有结果（被取消、本地错误）时应调用 release_probe；
+    超过 probe_timeout 秒仍未结束的探测视为丢失，再放行一个新的探测。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None, probe_timeout: float = None):
+        self.failure_threshold = failure_threshold or QUERY_CONFIG['circuit_failure_threshold']
+        self.reset_timeout = reset_timeout if reset_timeout is not None else QUERY_CONFIG['circuit_reset_timeout']
+        self.probe_timeout = probe_timeout if probe_timeout is not None else QUERY_CONFIG['circuit_probe_timeout']
+
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """当前是否允许发起请求"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probing = False
+
+            now = time.monotonic()
+            if self._probing and now - self._probe_started < self.probe_timeout:
+                return False
+
+            self._probing = True
+            self._probe_started = now
+            return True
+
+    def release_probe(self):
+        """请求结束但没有可判断的结果（被取消、本地错误）：释放探测名额，不改变状态"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        """记录一次成功"""
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """记录一次失败"""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+搜索结果缓存服务
+"""
+
+import time
+import logging
+import threading
+from typing import Optional, List, Dict
+
+from config import STORAGE_CONFIG, SEARCH_CACHE_CONFIG, PRICE_QUERY_FIELDS
+from utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+
+class SearchCacheService:
+    """findByPage 响应缓存（按 blurValue 和分页参数索引，持久化到本地）"""
+
+    def __init__(self, ttl: int = None, max_entries: int = None):
+        self.cache_file = STORAGE_CONFIG['search_cache_file']
+        self.ttl = ttl if ttl is not None else SEARCH_CACHE_CONFIG['ttl']
+        self.max_entries = max_entries or SEARCH_CACHE_CONFIG['max_entries']
+
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._loaded = False
+        self._save_timer = None
+
+    @staticmethod
+    def make_key(blur_value: str, limit: int, start: int = 0) -> str:
+        """生成缓存键，型号忽略大小写和首尾空白"""
+        return f"{(blur_value or '').strip().upper()}|{start}|{limit}"
+
+    def load(self) -> bool:
+        """加载缓存"""
+        with self._lock:
+            self._loaded = True
+
+            if not self.cache_file.exists():
+                return False
+
+            try:
+                data = json_codec.load_file(self.cache_file)
+
+                self._entries = data.get('entries', {})
+                logger.info(f"加载搜索缓存成功，共 {len(self._entries)} 条")
+                return True
+
+            except Exception as e:
+                logger.error(f"加载搜索缓存失败: {e}")
+                self._entries = {}
+                return False
+
+    def ensure_loaded(self):
+        """尚未加载时加载缓存文件"""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+
+    def save(self):
+        """
+        保存缓存
+
+        只在锁内复制条目字典（条目写入后不再修改），序列化和写文件在锁外进行，
+        不阻塞同时进行的 get/set。
+        """
+        with self._write_lock:
+            with self._lock:
+                entries = dict(self._entries)
+
+            try:
+                data = {
+                    'cache_version': '1.0',
+                    'entries': entries,
+                }
+                json_codec.dump_file(data, self.cache_file)
+            except Exception as e:
+                logger.error(f"保存搜索缓存失败: {e}")
+
+    def _schedule_save(self):
+        """延迟保存，合并短时间内的多次写入"""
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(SEARCH_CACHE_CONFIG['save_delay'], self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """立即保存未写入的缓存，没有待保存的修改时不写文件"""
+        with self._lock:
+            if self._save_timer is None:
+                return
+            self._save_timer.cancel()
+            self._save_timer = None
+        self.save()
+
+    def get(self, blur_value: str, limit: int, start: int = 0, allow_stale: bool = False) -> Optional[dict]:
+        """
+        获取缓存的响应
+
+        Args:
+            blur_value: 搜索关键字
+            limit: 分页大小
+            start: 分页起始位置
+            allow_stale: 是否返回已过期的条目
+
+        Returns:
+            {'time': 时间戳, 'total': 总数, 'rows': 原始数据行}，未命中返回None
+        """
+        with self._lock:
+            if not self._loaded:
+                self.load()
+
+            entry = self._entries.get(self.make_key(blur_value, limit, start))
+
+            if entry is None:
+                return None
+
+            if not allow_stale and not self.is_fresh(entry):
+                return None
+
+            return entry
+
+    def peek(self, blur_value: str, limit: int, start: int = 0) -> Optional[dict]:
+        """
+        不加锁、不读取文件地获取条目（含已过期的），供 UI 线程使用
+
+        缓存尚未加载时返回None。条目写入后不再修改，单次字典读取不需要加锁。
+        """
+        if not self._loaded:
+            return None
+        return self._entries.get(self.make_key(blur_value, limit, start))
+
+    def is_fresh(self, entry: dict) -> bool:
+        """条目是否仍在有效期内"""
+        return time.time() - entry.get('time', 0) < self.ttl
+
+    def set(self, blur_value: str, limit: int, rows: List[dict], total: int = None, start: int = 0):
+        """写入缓存，稍后在后台线程中持久化"""
+        compact_rows = [
+            {key: row[key] for key in PRICE_QUERY_FIELDS.values() if key in row}
+            for row in rows
+        ]
+
+        with self._lock:
+            if not self._loaded:
+                self.load()
+
+            self._entries[self.make_key(blur_value, limit, start)] = {
+                'time': time.time(),
+                'total': total,
+                'rows': compact_rows,
+            }
+
+            self._evict()
+            self._schedule_save()
+
+    def _evict(self):
+        """超出容量时淘汰最旧的条目"""
+        overflow = len(self._entries) - self.max_entries
+        if overflow <= 0:
+            return
+
+        oldest = sorted(self._entries, key=lambda k: self._entries[k].get('time', 0))[:overflow]
+        for key in oldest:
+            del self._entries[key]
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries = {}
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+
+        with self._write_lock:
+            if self.cache_file.exists():
+                self.cache_file.unlink()
+
+        logger.info("搜索缓存已清空")
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+离线快照服务
+"""
+
+import time
+import logging
+import threading
+from typing import Optional, List, Dict
+
+from config import STORAGE_CONFIG, SNAPSHOT_CONFIG
+from models import ProductInfo, InventoryInfo
+from utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotResult(list):
+    """来自离线快照的结果列表，as_of 为数据获取时间"""
+
+    def __init__(self, items=(), as_of: str = ''):
+        super().__init__(items)
+        self.as_of = as_of
+
+
+class SnapshotService:
+    """按型号保存最近一次成功的搜索和库存结果，CRM 不可用时兜底"""
+
+    def __init__(self):
+        self.snapshot_file = STORAGE_CONFIG['snapshot_file']
+        self.max_entries = SNAPSHOT_CONFIG['max_entries']
+        self.max_usage_entries = SNAPSHOT_CONFIG['max_usage_entries']
+
+        self._search: Dict[str, dict] = {}
+        self._inventory: Dict[str, dict] = {}
+        self._usage: Dict[str, int] = {}
+
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._loaded = False
+        self._save_timer = None
+
+    @staticmethod
+    def _key(model: str) -> str:
+        return (model or '').strip().upper()
+
+    def load(self) -> bool:
+        """加载快照"""
+        with self._lock:
+            self._loaded = True
+
+            if not self.snapshot_file.exists():
+                return False
+
+            try:
+                data = json_codec.load_file(self.snapshot_file)
+
+                self._search = data.get('search', {})
+                self._inventory = data.get('inventory', {})
+                self._usage = data.get('usage', {})
+                return True
+
+            except Exception as e:
+                logger.error(f"加载离线快照失败: {e}")
+                return False
+
+    def save(self):
+        """
+        保存快照
+
+        只在锁内复制各字典（条目写入后不再修改），序列化和写文件在锁外进行。
+        """
+        with self._write_lock:
+            with self._lock:
+                data = {
+                    'cache_version': '1.0',
+                    'search': dict(self._search),
+                    'inventory': dict(self._inventory),
+                    'usage': dict(self._usage),
+                }
+
+            try:
+                json_codec.dump_file(data, self.snapshot_file)
+            except Exception as e:
+                logger.error(f"保存离线快照失败: {e}")
+
+    def _schedule_save(self):
+        """延迟保存，合并短时间内的多次写入"""
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(SNAPSHOT_CONFIG['save_delay'], self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """立即保存未写入的快照，没有待保存的修改时不写文件"""
+        with self._lock:
+            if self._save_timer is None:
+                return
+            self._save_timer.cancel()
+            self._save_timer = None
+        self.save()
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def _trim(self, entries: Dict[str, dict]):
+        """超出容量时淘汰最旧的条目"""
+        overflow = len(entries) - self.max_entries
+        if overflow > 0:
+            for key in sorted(entries, key=lambda k: entries[k].get('time', ''))[:overflow]:
+                del entries[key]
+
+    def record_usage(self, model: str):
+        """记录型号查询次数，用于预取常用型号"""
+        key = self._key(model)
+        if not key:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            self._usage[key] = self._usage.get(key, 0) + 1
+            self._trim_usage(key)
+            self._schedule_save()
+
+    def _trim_usage(self, keep: str):
+        """查询次数表超出容量时淘汰次数最少的型号（刚记录的型号保留）"""
+        overflow = len(self._usage) - self.max_usage_entries
+        if overflow <= 0:
+            return
+        candidates = sorted((k for k in self._usage if k != keep), key=lambda k: self._usage[k])
+        for key in candidates[:overflow]:
+            del self._usage[key]
+
+    def get_usual_models(self, limit: int = None) -> List[str]:
+        """按查询次数返回常用型号"""
+        with self._lock:
+            self._ensure_loaded()
+            models = sorted(self._usage, key=lambda k: self._usage[k], reverse=True)
+        return models[:limit or SNAPSHOT_CONFIG['prefetch_limit']]
+
+    def save_search(self, model: str, products: List[ProductInfo]):
+        """保存搜索结果快照"""
+        key = self._key(model)
+        if not key:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            self._search[key] = {
+                'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'products': [p.to_dict() for p in products[:SNAPSHOT_CONFIG['max_products']]],
+            }
+            self._trim(self._search)
+            self._schedule_save()
+
+    def get_search(self, model: str) -> Optional[SnapshotResult]:
+        """获取搜索结果快照"""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._search.get(self._key(model))
+
+        if entry is None:
+            return None
+
+        return SnapshotResult(
+            (ProductInfo.from_trusted_dict(d) for d in entry['products']),
+            as_of=entry.get('time', '')
+        )
+
+    def save_inventory(self, model: str, inventory_list: List[InventoryInfo]):
+        """保存库存快照"""
+        key = self._key(model)
+        if not key:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            self._inventory[key] = {
+                'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'rows': [inv.to_dict() for inv in inventory_list],
+            }
+            self._trim(self._inventory)
+            self._schedule_save()
+
+    def get_inventory(self, model: str) -> Optional[SnapshotResult]:
+        """获取库存快照"""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._inventory.get(self._key(model))
+
+        if entry is None:
+            return None
+
+        return SnapshotResult(
+            (InventoryInfo.from_trusted_dict(d) for d in entry['rows']),
+            as_of=entry.get('time', '')
+        )
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+熔断器半开探测测试
+
+探测请求无论以何种方式结束（服务端错误、非 JSON 响应、被取消），熔断器都
+不能停留在“探测中”而拒绝之后的所有请求。
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.retry_policy import RetryPolicy, CircuitBreaker
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """按 server.responses 的顺序返回 (状态码, 响应体, 延迟秒数)，用完后返回最后一个"""
+
+    def do_GET(self):
+        responses = self.server.responses
+        status, body, delay = responses.pop(0) if len(responses) > 1 else responses[0]
+        if delay:
+            time.sleep(delay)
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    httpd.responses = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _breaker():
+    return CircuitBreaker(failure_threshold=1, reset_timeout=0, probe_timeout=60)
+
+
+def _async_client(server, breaker):
+    aiohttp = pytest.importorskip('aiohttp')
+    from services.async_auth_service import AsyncAuthService
+
+    client = AsyncAuthService(cookies={'JSESSIONID': 'x'})
+    client.base_url = f'http://127.0.0.1:{server.server_port}'
+    client.retry_policy = RetryPolicy(max_retries=1)
+    client.circuit_breaker = breaker
+    return client
+
+
+def test_lost_probe_times_out():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0, probe_timeout=0.05)
+    breaker.record_failure()
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_release_probe_allows_next_probe():
+    breaker = _breaker()
+    breaker.record_failure()
+
+    assert breaker.allow_request()
+    breaker.release_probe()
+    assert breaker.allow_request()
+
+
+def test_async_non_json_probe_does_not_stick(server):
+    breaker = _breaker()
+    client = _async_client(server, breaker)
+    server.responses = [
+        (503, b'busy', 0),
+        (200, b'<html>login</html>', 0),
+        (200, b'{"success": true}', 0),
+    ]
+
+    async def run():
+        try:
+            return [await client._get('/api') for _ in range(3)]
+        finally:
+            await client.close()
+
+    first, probe, after = asyncio.run(run())
+
+    assert first is None
+    assert probe is None
+    assert after == {'success': True}
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_async_cancelled_probe_is_released(server):
+    breaker = _breaker()
+    client = _async_client(server, breaker)
+    server.responses = [(200, b'{}', 1)]
+    breaker.record_failure()
+
+    async def run():
+        try:
+            task = asyncio.create_task(client._get('/api'))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+
+
+
+def _sync_client(server, breaker, max_retries=3):
+    from services.auth_service import AuthService
+
+    client = AuthService()
+    client.base_url = f'http://127.0.0.1:{server.server_port}'
+    client.retry_policy = RetryPolicy(max_retries=max_retries, backoff_base=0, backoff_max=0)
+    client.circuit_breaker = breaker
+    return client
+
+
+def test_sync_non_json_probe_does_not_stick(server):
+    breaker = _breaker()
+    client = _sync_client(server, breaker, max_retries=1)
+    server.responses = [
+        (503, b'busy', 0),
+        (200, b'<html>login</html>', 0),
+        (200, b'{"success": true}', 0),
+    ]
+
+    assert client._get('/api') is None
+    assert client._get('/api') is None
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert client._get('/api') == {'success': True}
+
+
+def test_non_json_is_not_retried(server):
+    """两个客户端对“200 但不是 JSON”的处理一致：服务端已应答，不重试、不计为失败"""
+    breaker = _breaker()
+    client = _sync_client(server, breaker)
+    server.responses = [(200, b'<html>login</html>', 0), (200, b'{}', 0)]
+
+    assert client._get('/api') is None
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    async_client = _async_client(server, breaker)
+    async_client.retry_policy = client.retry_policy
+    server.responses = [(200, b'<html>login</html>', 0), (200, b'{}', 0)]
+
+    async def run():
+        try:
+            return await async_client._get('/api')
+        finally:
+            await async_client.close()
+
+    assert asyncio.run(run()) is None
+    assert breaker.state == CircuitBreaker.CLOSED
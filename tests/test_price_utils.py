@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+批量折扣价计算与逐行计算的一致性测试
+
+随机生成价格和折扣字符串，分别在 NumPy 路径和纯 Python 路径下比较
+calculate_discount_prices_batch 与 calculate_discount_prices 的结果。
+"""
+
+import random
+
+import pytest
+
+from utils import price_utils
+from utils.price_utils import calculate_discount_prices, calculate_discount_prices_batch
+
+SEEDS = range(20)
+
+DISCOUNTS = [
+    '0.5~0.45', '0.55-0.5', '0.6 ~ 0.52', '1~1', '0.333~0.3',
+    '', None, 'abc', '0.5', '0.5~', '~0.4', '0.5~0.4~0.3',
+]
+
+
+def _random_price(rng: random.Random):
+    kind = rng.random()
+    if kind < 0.1:
+        return 0
+    if kind < 0.15:
+        return -rng.uniform(1, 1000)
+    if kind < 0.4:
+        return rng.randint(1, 200000)
+    # 覆盖各取整区间的边界附近
+    return rng.choice([rng.uniform(0, 100), rng.uniform(100, 1000), rng.uniform(1000, 10000),
+                       rng.uniform(10000, 1000000), rng.choice([99.99, 100, 999.5, 1000, 9999.9, 10000])])
+
+
+def _random_discount(rng: random.Random):
+    if rng.random() < 0.7:
+        return rng.choice(DISCOUNTS)
+    high = round(rng.uniform(0.1, 1.2), rng.randint(1, 4))
+    low = round(rng.uniform(0.1, high), rng.randint(1, 4))
+    return f'{high}{rng.choice("~-")}{low}'
+
+
+def _random_rows(seed: int):
+    rng = random.Random(seed)
+    count = rng.randint(0, 300)
+    return [_random_price(rng) for _ in range(count)], [_random_discount(rng) for _ in range(count)]
+
+
+def _scalar(prices, discounts, missing=None):
+    highs = []
+    lows = []
+    for price, discount in zip(prices, discounts):
+        high, low = calculate_discount_prices(price, discount)
+        highs.append(missing if high is None else high)
+        lows.append(missing if low is None else low)
+    return highs, lows
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    """分别走 NumPy 路径和强制的纯 Python 路径"""
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        monkeypatch.setattr(price_utils, '_numpy_checked', False)
+        monkeypatch.setattr(price_utils, 'np', None)
+        monkeypatch.setattr(price_utils, 'NUMPY_MIN_BATCH', 0)
+        assert price_utils._load_numpy() is not None
+    else:
+        monkeypatch.setattr(price_utils, '_load_numpy', lambda: None)
+    return request.param
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_batch_matches_scalar(backend, seed):
+    prices, discounts = _random_rows(seed)
+
+    assert calculate_discount_prices_batch(prices, discounts) == _scalar(prices, discounts)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_batch_missing_value(backend, seed):
+    prices, discounts = _random_rows(seed)
+
+    assert calculate_discount_prices_batch(prices, discounts, missing=-1) == _scalar(prices, discounts, missing=-1)
+
+
+def test_batch_returns_python_ints(backend):
+    highs, lows = calculate_discount_prices_batch([1234.5, 88], ['0.5~0.45', '0.5~0.45'])
+
+    assert highs == [620, 45]
+    assert lows == [555, 40]
+    assert all(type(value) is int for value in highs + lows)
+
+
+def test_batch_non_numeric_price(backend):
+    highs, lows = calculate_discount_prices_batch(['', None, 100], ['0.5~0.45'] * 3)
+
+    assert highs == [None, None, 50]
+    assert lows == [None, None, 45]
+
+
+def test_small_batch_does_not_import_numpy(monkeypatch):
+    """一页搜索结果在 UI 线程上解析时不应触发 NumPy 导入"""
+    def fail():
+        raise AssertionError('small batch loaded numpy')
+
+    monkeypatch.setattr(price_utils, '_load_numpy', fail)
+    prices, discounts = _random_rows(0)
+    prices, discounts = prices[:50], discounts[:50]
+
+    assert calculate_discount_prices_batch(prices, discounts) == _scalar(prices, discounts)
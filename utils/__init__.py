@@ -1,4 +1,9 @@
 # -*- coding: utf-8 -*-
-from .price_utils import round_price, calculate_discount_prices
+from .price_utils import round_price, calculate_discount_prices, calculate_discount_prices_batch, parse_discount, to_price
+from .time_utils import format_age
+from .startup_timer import StartupTimer
 
-__all__ = ['round_price', 'calculate_discount_prices']
+__all__ = [
+    'round_price', 'calculate_discount_prices', 'calculate_discount_prices_batch', 'parse_discount', 'to_price',
+    'format_age', 'StartupTimer',
+]
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 编解码
+
+安装了 orjson 时使用 orjson，否则回退到标准库 json。
+输出统一为紧凑格式的 UTF-8 字节，中文不转义。
+"""
+
+import json
+import os
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def loads(data):
+    """解析 JSON（str 或 bytes）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj) -> bytes:
+    """序列化为紧凑的 UTF-8 JSON 字节"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def load_file(path):
+    """读取 JSON 文件"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def dump_file(obj, path):
+    """
+    写入 JSON 文件
+
+    先写同目录下的 .tmp 文件并刷到磁盘，再用 os.replace 替换原文件，
+    写入中途退出或断电时原文件保持完整。
+    """
+    path = Path(path)
+    data = dumps(obj)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
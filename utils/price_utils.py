@@ -3,7 +3,41 @@
 价格计算工具
 """
 
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Sequence
+
+# NumPy 导入耗时较长，第一次批量计算时才导入，不放在启动路径上
+np = None
+_numpy_checked = False
+
+# 少于此行数的批量计算走纯 Python：一页搜索结果（50 行）用 NumPy 并不更快，
+# 而且在 UI 线程上解析缓存命中时不能触发 NumPy 的导入
+NUMPY_MIN_BATCH = 500
+
+
+def _load_numpy():
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+        _numpy_checked = True
+    return np
+
+
+def to_price(value) -> Optional[float]:
+    """
+    把价格字段转为正数
+
+    CRM 行中无法转换的价格会保留原始字符串；无法转换或不大于0（未报价、
+    本地未确认的行）时返回None。
+    """
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
 
 
 def round_price(price: float) -> int:
@@ -36,6 +70,34 @@ def round_price(price: float) -> int:
         return ((price_int // 100) + 1) * 100
 
 
+def parse_discount(business_discount: str) -> Optional[Tuple[float, float]]:
+    """
+    解析业务折扣字符串
+    
+    Args:
+        business_discount: 业务折扣字符串，如 "0.5~0.45" 或 "0.5-0.45"
+        
+    Returns:
+        (高折扣, 低折扣) 元组，无法解析返回None
+    """
+    if not business_discount or not isinstance(business_discount, str):
+        return None
+    
+    parts = None
+    for separator in ['~', '-']:
+        if separator in business_discount:
+            parts = business_discount.split(separator)
+            break
+    
+    if not parts or len(parts) != 2:
+        return None
+    
+    try:
+        return float(parts[0].strip()), float(parts[1].strip())
+    except ValueError:
+        return None
+
+
 def calculate_discount_prices(price: float, business_discount: str) -> Tuple[Optional[int], Optional[int]]:
     """
     计算高折扣价格和低折扣价格
@@ -47,29 +109,108 @@ def calculate_discount_prices(price: float, business_discount: str) -> Tuple[Opt
     Returns:
         (高折扣价格, 低折扣价格) 元组
     """
-    if not price or not business_discount:
+    if not price:
         return None, None
     
-    try:
-        parts = None
-        for separator in ['~', '-']:
-            if separator in business_discount:
-                parts = business_discount.split(separator)
-                break
-        
-        if not parts or len(parts) != 2:
-            return None, None
-        
-        high_discount = float(parts[0].strip())
-        low_discount = float(parts[1].strip())
+    discount = parse_discount(business_discount)
+    if discount is None:
+        return None, None
+    
+    high_discount, low_discount = discount
+    
+    return round_price(price * high_discount), round_price(price * low_discount)
+
+
+def calculate_discount_prices_batch(prices: Sequence[float], discounts: Sequence[str],
+                                    missing=None) -> Tuple[list, list]:
+    """
+    批量计算高折扣价格和低折扣价格
+    
+    每个不同的折扣字符串只解析一次。行数不少于 NUMPY_MIN_BATCH 且安装了 NumPy 时
+    取整按数组整体计算，否则逐行调用 round_price，两种方式结果与
+    calculate_discount_prices 一致。
+    
+    Args:
+        prices: 产品价格序列
+        discounts: 业务折扣字符串序列，与 prices 等长
+        missing: 无法计算时填充的值
         
-        high_price = price * high_discount
-        low_price = price * low_discount
+    Returns:
+        (高折扣价格列表, 低折扣价格列表)
+    """
+    parsed = {d: parse_discount(d) for d in set(discounts)}
+    
+    if len(discounts) < NUMPY_MIN_BATCH or _load_numpy() is None:
+        return _discount_prices_python(prices, discounts, parsed, missing)
+    
+    return _discount_prices_numpy(prices, discounts, parsed, missing)
+
+
+def _as_price(price) -> float:
+    """无法参与计算的价格转为0"""
+    if isinstance(price, (int, float)):
+        return price
+    return 0.0
+
+
+def _discount_prices_python(prices, discounts, parsed, missing):
+    highs = []
+    lows = []
+    cache = {}
+    
+    for price, discount in zip(prices, discounts):
+        factors = parsed[discount]
+        price = _as_price(price)
         
-        high_rounded = round_price(high_price)
-        low_rounded = round_price(low_price)
+        if not price or factors is None:
+            highs.append(missing)
+            lows.append(missing)
+            continue
         
-        return high_rounded, low_rounded
+        key = (price, discount)
+        result = cache.get(key)
+        if result is None:
+            result = (round_price(price * factors[0]), round_price(price * factors[1]))
+            cache[key] = result
         
-    except (ValueError, AttributeError):
-        return None, None
+        highs.append(result[0])
+        lows.append(result[1])
+    
+    return highs, lows
+
+
+def _round_prices_numpy(values):
+    """round_price 的数组版本"""
+    truncated = np.trunc(values).astype(np.int64)
+    step = np.where(truncated < 1000, 5, np.where(truncated < 10000, 10, 100))
+    rounded = -(-truncated // step) * step
+    return np.where(values <= 0, 0, rounded)
+
+
+def _discount_prices_numpy(prices, discounts, parsed, missing):
+    unique = list(parsed)
+    position = {d: i for i, d in enumerate(unique)}
+    factors = np.array(
+        [parsed[d] if parsed[d] is not None else (np.nan, np.nan) for d in unique],
+        dtype=np.float64
+    ).reshape(-1, 2)
+    index = np.fromiter((position[d] for d in discounts), dtype=np.intp, count=len(discounts))
+    
+    price_array = np.fromiter((_as_price(p) for p in prices), dtype=np.float64, count=len(discounts))
+    high_factor = factors[index, 0]
+    low_factor = factors[index, 1]
+    
+    valid = (price_array != 0) & ~np.isnan(high_factor)
+    
+    with np.errstate(invalid='ignore'):
+        highs = _round_prices_numpy(np.where(valid, price_array * high_factor, 0))
+        lows = _round_prices_numpy(np.where(valid, price_array * low_factor, 0))
+    
+    if missing is None:
+        valid_list = valid.tolist()
+        return (
+            [h if ok else None for h, ok in zip(highs.tolist(), valid_list)],
+            [l if ok else None for l, ok in zip(lows.tolist(), valid_list)],
+        )
+    
+    return np.where(valid, highs, missing).tolist(), np.where(valid, lows, missing).tolist()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+启动阶段计时
+
+记录启动各阶段的单调时钟时间，用于比较不同版本的冷启动耗时。
+计时只在内存中记录；第一帧显示后由应用在后台线程中调用一次 save()
+写入数据目录。计时点放在应用和屏幕层，服务层不依赖本模块。
+
+用法:
+    with startup_timer.phase('load_kv'):
+        Builder.load_string(KV_STYLE)
+    ...
+    startup_timer.finish()              # 第一帧（UI 线程）
+    background.submit(startup_timer.save)
+"""
+
+import logging
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional
+
+from utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """启动计时器，时间均为相对计时器创建时刻的毫秒数"""
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._phases: List[dict] = []
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._first_frame_ms: Optional[float] = None
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self._origin) * 1000
+
+    @property
+    def finished(self) -> bool:
+        return self._first_frame_ms is not None
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        记录一个阶段的开始时间和耗时
+
+        第一帧之后结束的阶段（如后台加载缓存）也会记录，标记为 after_first_frame；
+        这类阶段只记录第一次。记录只在内存中进行，不写文件。
+        """
+        start = self._now_ms()
+        try:
+            yield
+        finally:
+            self._record(name, start, self._now_ms() - start)
+
+    def mark(self, name: str):
+        """记录一个时间点（耗时为0的阶段）"""
+        self._record(name, self._now_ms(), 0.0)
+
+    def _record(self, name: str, start_ms: float, duration_ms: float):
+        with self._lock:
+            finished = self.finished
+            if finished and any(p['name'] == name for p in self._phases):
+                return
+            self._phases.append({
+                'name': name,
+                'start_ms': round(start_ms, 1),
+                'duration_ms': round(duration_ms, 1),
+                'thread': threading.current_thread().name,
+                'after_first_frame': finished,
+            })
+
+    def finish(self) -> dict:
+        """第一帧已显示：记录总耗时（不写文件，报告由 save() 在后台线程写入）"""
+        with self._lock:
+            if self._first_frame_ms is None:
+                self._first_frame_ms = self._now_ms()
+
+        report = self.report()
+        logger.info(f"启动完成: {report['first_frame_ms']:.0f}ms")
+        return report
+
+    def report(self) -> dict:
+        """机器可读的启动报告"""
+        with self._lock:
+            phases = [dict(p) for p in self._phases]
+            first_frame_ms = self._first_frame_ms
+
+        kivy = sys.modules.get('kivy')
+        return {
+            'timestamp': self._started_at,
+            'first_frame_ms': round(first_frame_ms, 1) if first_frame_ms is not None else None,
+            'phases': phases,
+            'environment': {
+                'platform': sys.platform,
+                'machine': platform.machine(),
+                'python': platform.python_version(),
+                'kivy': getattr(kivy, '__version__', ''),
+                'json': json_codec.BACKEND,
+            },
+        }
+
+    def save(self, report: dict = None, path=None):
+        """
+        写入 startup_report.json：latest 为本次报告，history 保留最近几次的摘要
+
+        会读写文件，应在后台线程中调用。写入失败只记录日志，不影响启动。
+        """
+        from config import STORAGE_CONFIG, STARTUP_CONFIG
+
+        report = report if report is not None else self.report()
+        path = path or STORAGE_CONFIG['startup_report_file']
+
+        with self._save_lock:
+            self._write(report, path, STARTUP_CONFIG['history_size'])
+
+    def _write(self, report: dict, path, history_size: int):
+        try:
+            history = []
+            if path.exists():
+                try:
+                    history = json_codec.load_file(path).get('history', [])
+                except Exception:
+                    history = []
+
+            summary = {
+                'timestamp': report['timestamp'],
+                'first_frame_ms': report['first_frame_ms'],
+                'phases': {p['name']: p['duration_ms'] for p in report['phases']},
+            }
+            # 同一次启动中重新写入时（timestamp 为启动时刻）替换本次的摘要
+            if history and history[-1]['timestamp'] == summary['timestamp']:
+                history[-1] = summary
+            else:
+                history.append(summary)
+
+            json_codec.dump_file(
+                {'latest': report, 'history': history[-history_size:]},
+                path
+            )
+        except Exception as e:
+            logger.error(f"保存启动报告失败: {e}")
+
+    def format_lines(self) -> List[str]:
+        """调试浮层显示的文本行"""
+        report = self.report()
+        lines = [f"首帧 {report['first_frame_ms'] or 0:.0f}ms"]
+        for p in report['phases']:
+            late = ' *' if p['after_first_frame'] else ''
+            lines.append(f"{p['name']}: +{p['start_ms']:.0f}ms {p['duration_ms']:.0f}ms{late}")
+        return lines
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+时间显示工具
+"""
+
+
+def format_age(seconds: float) -> str:
+    """
+    将时长格式化为相对时间
+    - 1分钟内：刚刚
+    - 1小时内：N分钟前
+    - 1天内：N小时前
+    - 其他：N天前
+    """
+    if seconds is None or seconds < 60:
+        return '刚刚'
+    
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f'{minutes}分钟前'
+    
+    hours = minutes // 60
+    if hours < 24:
+        return f'{hours}小时前'
+    
+    return f'{hours // 24}天前'